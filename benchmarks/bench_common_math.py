@@ -0,0 +1,41 @@
+"""
+    Modular inversion timings, mod the secp256k1 order. Run from the project root:
+
+    python -m benchmarks.bench_common_math
+"""
+import timeit
+from pytss.common_math import (
+    batch_modular_inverse,
+    compute_modular_inverse,
+    extended_euclidian
+)
+from pytss.elliptic_curve import (
+    secp256k1_order
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+
+BATCH_SIZES = [1, 10, 100, 1000]
+
+def _extended_euclid_inverse(a, modulo_base) -> int:
+    # how compute_modular_inverse used to work
+    return extended_euclidian(a, modulo_base).bezout_x % modulo_base
+
+def _time(fn) -> float:
+    rounds = 20
+    return timeit.timeit(fn, number=rounds) / rounds * 1000
+
+def main():
+    print(f'{"values":<10}{"euclid loop":>14}{"pow loop":>14}{"batch":>14}   (ms)')
+    for size in BATCH_SIZES:
+        values = [ gen_random_int(1, secp256k1_order) for _ in range(size) ]
+        timings = [
+            _time(lambda: [ _extended_euclid_inverse(each, secp256k1_order) for each in values ]),
+            _time(lambda: [ compute_modular_inverse(each, secp256k1_order) for each in values ]),
+            _time(lambda: batch_modular_inverse(values, secp256k1_order))
+        ]
+        print(f'{size:<10}' + ''.join(f'{each:>14.3f}' for each in timings))
+
+if __name__ == '__main__':
+    main()
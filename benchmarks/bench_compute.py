@@ -0,0 +1,48 @@
+"""
+    Throughput of a batch of MtoA-sized Paillier operations, inline vs. on a process pool.
+    Run from the project root:
+
+    python -m benchmarks.bench_compute [workers]
+"""
+import os
+import sys
+import time
+from pytss.compute import (
+    InlineComputeBackend,
+    ProcessPoolComputeBackend,
+    _homomorphic_multiply
+)
+from pytss.elliptic_curve import (
+    secp256k1_order
+)
+from pytss.paillier import (
+    generate_key_pair
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+
+BATCH_SIZE = 64
+
+def _throughput(backend, args_list) -> float:
+    start = time.perf_counter()
+    backend.map(_homomorphic_multiply, args_list)
+    return len(args_list) / (time.perf_counter() - start)
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    public, _ = generate_key_pair(2048)
+    ciphertext = public.encrypt(gen_random_int(1, secp256k1_order))
+    args_list = [ (public, ciphertext, gen_random_int(1, secp256k1_order)) for _ in range(BATCH_SIZE) ]
+
+    print(f'inline: {_throughput(InlineComputeBackend(), args_list):.1f} ops/s')
+
+    backend = ProcessPoolComputeBackend(max_workers=workers)
+    try:
+        backend.map(_homomorphic_multiply, args_list[:workers]) # warm up the workers
+        print(f'process pool ({workers} workers): {_throughput(backend, args_list):.1f} ops/s')
+    finally:
+        backend.close()
+
+if __name__ == '__main__':
+    main()
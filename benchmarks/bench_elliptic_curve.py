@@ -0,0 +1,48 @@
+"""
+    Scalar multiplication timings. Run from the project root:
+
+    python -m benchmarks.bench_elliptic_curve
+"""
+import timeit
+import pytss.elliptic_curve as elliptic_curve
+from pytss.elliptic_curve import (
+    Point,
+    multi_scalar_mul,
+    secp256k1,
+    secp256k1_generator,
+    secp256k1_order
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+
+ROUNDS = 50
+
+def _time(fn) -> float:
+    return timeit.timeit(fn, number=ROUNDS) / ROUNDS * 1000
+
+def main():
+    # A copy of the generator without its fixed-base table, i.e. a variable base
+    P = Point(secp256k1_generator.x.value, secp256k1_generator.y.value, secp256k1)
+    Q = gen_random_int(1, secp256k1_order) * P
+    k = gen_random_int(1, secp256k1_order)
+    l = gen_random_int(1, secp256k1_order)
+
+    # build the generator table up front, it's a one-off cost
+    k * secp256k1_generator
+
+    print(f'{"":<36}{"generic":>10}{"glv":>10}   (ms)')
+    cases = [
+        ("k * G (fixed-base table)", lambda: k * secp256k1_generator),
+        ("k * P", lambda: k * P),
+        ("k * P + l * Q", lambda: multi_scalar_mul([(k, P), (l, Q)])),
+    ]
+    for name, fn in cases:
+        elliptic_curve.ENABLE_GLV = False
+        generic = _time(fn)
+        elliptic_curve.ENABLE_GLV = True
+        glv = _time(fn)
+        print(f'{name:<36}{generic:>10.3f}{glv:>10.3f}')
+
+if __name__ == '__main__':
+    main()
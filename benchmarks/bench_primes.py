@@ -0,0 +1,47 @@
+"""
+    Prime generation timings. Run from the project root:
+
+    python -m benchmarks.bench_primes [samples]
+"""
+import sys
+import time
+import pytss.common_crypto as common_crypto
+from pytss.common_crypto import (
+    is_prime,
+    prime_of_n_bits
+)
+
+BIT_SIZES = [1024, 1536]
+
+def _time(fn, samples) -> float:
+    start = time.perf_counter()
+    for _ in range(samples):
+        fn()
+    return (time.perf_counter() - start) / samples * 1000
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rounds_by_bits = common_crypto.MILLER_RABIN_ROUNDS_BY_BITS
+
+    print(f'{"":<36}' + ''.join(f'{bits:>10}' for bits in BIT_SIZES) + '   (ms)')
+    cases = [
+        # 25 Miller-Rabin rounds at every size, trial division by the primes below 1000 only
+        ("before", [], lambda bits: prime_of_n_bits(bits, 2, sieve_bound=1000)),
+        ("sieve + FIPS 186-5 rounds", rounds_by_bits, lambda bits: prime_of_n_bits(bits, 2)),
+        ("sieve + Baillie-PSW", rounds_by_bits, lambda bits: prime_of_n_bits(bits, 2, baillie_psw=True)),
+    ]
+    for name, table, fn in cases:
+        common_crypto.MILLER_RABIN_ROUNDS_BY_BITS = table
+        timings = [ _time(lambda: fn(bits), samples) for bits in BIT_SIZES ]
+        print(f'{name:<36}' + ''.join(f'{timing:>10.1f}' for timing in timings))
+    common_crypto.MILLER_RABIN_ROUNDS_BY_BITS = rounds_by_bits
+
+    # Confirming a prime is the fixed cost at the end of every search
+    primes = { bits: prime_of_n_bits(bits, 2) for bits in BIT_SIZES }
+    print()
+    print(f'{"is_prime(p), 25 rounds":<36}' + ''.join(f'{_time(lambda: is_prime(primes[bits], 25), samples):>10.1f}' for bits in BIT_SIZES))
+    print(f'{"is_prime(p), FIPS 186-5 rounds":<36}' + ''.join(f'{_time(lambda: is_prime(primes[bits]), samples):>10.1f}' for bits in BIT_SIZES))
+    print(f'{"is_prime(p), Baillie-PSW":<36}' + ''.join(f'{_time(lambda: is_prime(primes[bits], baillie_psw=True), samples):>10.1f}' for bits in BIT_SIZES))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+    Shamir share splitting timings. Run from the project root:
+
+    python -m benchmarks.bench_secret_sharing
+"""
+import timeit
+from pytss.secret_sharing import (
+    evaluate_polynomial,
+    _evaluate_polynomial
+)
+from pytss.elliptic_curve import (
+    secp256k1_order
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+
+PARTIES = [(3, 2), (50, 25), (100, 50), (500, 250)]
+
+def _pow_per_coefficient(coefficients, x, modulus) -> int:
+    # how shares used to be evaluated
+    acc = coefficients[0]
+    for i in range(1, len(coefficients)):
+        acc = (acc + coefficients[i] * pow(x, i, modulus)) % modulus
+    return acc
+
+def _time(fn) -> float:
+    rounds = 5
+    return timeit.timeit(fn, number=rounds) / rounds * 1000
+
+def main():
+    print(f'{"(n, t)":<16}{"pow":>12}{"horner":>12}{"batched":>12}   (ms)')
+    for n, t in PARTIES:
+        coefficients = [ gen_random_int(1, secp256k1_order) for _ in range(t) ]
+        xs = range(1, n + 1)
+        timings = [
+            _time(lambda: [ _pow_per_coefficient(coefficients, x, secp256k1_order) for x in xs ]),
+            _time(lambda: [ _evaluate_polynomial(coefficients, x, secp256k1_order) for x in xs ]),
+            _time(lambda: evaluate_polynomial(coefficients, xs, secp256k1_order))
+        ]
+        print(f'{str((n, t)):<16}' + ''.join(f'{each:>12.2f}' for each in timings))
+
+if __name__ == '__main__':
+    main()
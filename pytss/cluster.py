@@ -0,0 +1,455 @@
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+from collections import namedtuple
+from contextlib import nullcontext
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+import argparse
+import heapq
+import multiprocessing
+import queue
+import struct
+import threading
+import time
+import traceback
+from .elliptic_curve import (
+    Point,
+    secp256k1,
+    secp256k1_generator,
+    secp256k1_order
+)
+from .errors import (
+    PyTSSError
+)
+from .gg20 import (
+    BaseMessage,
+    BatchingDelegate,
+    CommunicationDelegate,
+    Parameters,
+    Participant
+)
+from .wire import (
+    WireCodec
+)
+from .common_crypto import (
+    gen_random_int
+)
+
+# Runs every Participant of a party in its own process, exchanging wire encoded messages
+# over pipes, with simulated network latency and bandwidth. Run from the project root
+# for a benchmark, e.g.:
+#
+#   python -m pytss.cluster --parties 3 --threshold 2 --signings 10 --latency 0.02
+
+KEY_GEN_ROUNDS = ["local", "broadcast", "p2p"]
+SIGNING_ROUNDS = ["mtoa", "delta", "shares"]
+
+# Seconds the slowest participant spent in each round
+KeyGenResult = namedtuple("KeyGenResult", "public_key seconds rounds")
+SigningResult = namedtuple("SigningResult", "session_id message signature seconds rounds")
+
+# Each frame between nodes is prefixed with when it's due at the recipient, in time.monotonic()
+# seconds, which is the same clock across processes on one machine
+DELIVER_AT = struct.Struct(">d")
+
+@dataclass
+class LinkProfile:
+    # One way latency in seconds, and bandwidth in bytes per second (None for unlimited),
+    # of every link between two participants
+    latency: float = 0.0
+    bandwidth: Optional[float] = None
+
+    def transfer_time(self, size: int) -> float:
+        return size / self.bandwidth if self.bandwidth else 0.0
+
+class _PipeDelegate(CommunicationDelegate):
+    # Sends to peers go out through the node's writer thread; messages to ourselves skip the wire
+
+    def __init__(self, node: "_Node"):
+        self.node = node
+
+    def broadcast(self, sender_id: int, message: BaseMessage):
+        for recipient_id in range(1, self.node.parameters.party_size + 1):
+            self.send(sender_id, recipient_id, message)
+
+    def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        if recipient_id == sender_id:
+            self.node.deliver_locally(message)
+        else:
+            self.node.transmit(recipient_id, message)
+
+class _Node:
+
+    def __init__(
+        self,
+        participant_id: int,
+        parameters: Parameters,
+        peers: Mapping[int, Connection],
+        control: Connection,
+        link: LinkProfile,
+        batching: bool
+    ):
+        self.participant_id = participant_id
+        self.parameters = parameters
+        self.peers = peers
+        self.control = control
+        self.link = link
+        self.codec = WireCodec(parameters)
+
+        delegate = _PipeDelegate(self)
+        self.delegate = BatchingDelegate(delegate) if batching else delegate
+        self.participant: Optional[Participant] = None
+
+        # (deliver at, sequence number, sender id, message or frame)
+        self._due: List[Tuple[float, int, int, object]] = []
+        self._sequence = 0
+        self._link_free_at: Dict[int, float] = { peer_id: 0.0 for peer_id in peers }
+        self._outgoing: "queue.Queue[Optional[Tuple[Connection, bytes]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+
+        # operation -> (start time, milestone -> elapsed); key gen is operation None,
+        # signing sessions are their session id
+        self._operations: Dict[Optional[int], Tuple[float, Dict[str, float]]] = {}
+
+    def run(self):
+        self._writer.start()
+        try:
+            while True:
+                timeout = max(0.0, self._due[0][0] - time.monotonic()) if self._due else None
+                for connection in wait([self.control, *self.peers.values()], timeout):
+                    if connection is self.control:
+                        command = self.control.recv()
+                        if command[0] == "stop":
+                            return
+                        self._handle_command(command)
+                    else:
+                        self._receive(connection)
+
+                self._deliver_due()
+                self._report_progress()
+        except Exception:
+            self.control.send(("error", self.participant_id, traceback.format_exc()))
+        finally:
+            self._outgoing.put(None)
+
+    def transmit(self, recipient_id: int, message: BaseMessage):
+        size = DELIVER_AT.size + self.codec.encoded_size(message)
+        now = time.monotonic()
+        # frames queue up behind each other on a link with limited bandwidth
+        self._link_free_at[recipient_id] = max(now, self._link_free_at[recipient_id]) + self.link.transfer_time(size)
+
+        frame = bytearray(size)
+        DELIVER_AT.pack_into(frame, 0, self._link_free_at[recipient_id] + self.link.latency)
+        self.codec.encode_into(message, frame, DELIVER_AT.size)
+        self._outgoing.put((self.peers[recipient_id], frame))
+
+    def deliver_locally(self, message: BaseMessage):
+        self._push(time.monotonic(), self.participant_id, message)
+
+    def _write(self):
+        while True:
+            item = self._outgoing.get()
+            if item is None:
+                return
+            connection, frame = item
+            connection.send_bytes(frame)
+
+    def _receive(self, connection: Connection):
+        try:
+            frame = connection.recv_bytes()
+        except EOFError:
+            # a peer shut down before us
+            del self.peers[next(peer_id for peer_id, each in self.peers.items() if each is connection)]
+            return
+
+        sender_id = next(peer_id for peer_id, each in self.peers.items() if each is connection)
+        deliver_at, = DELIVER_AT.unpack_from(frame)
+        self._push(deliver_at, sender_id, frame)
+
+    def _push(self, deliver_at: float, sender_id: int, item: object):
+        self._sequence += 1
+        heapq.heappush(self._due, (deliver_at, self._sequence, sender_id, item))
+
+    def _deliver_due(self):
+        while self._due and self._due[0][0] <= time.monotonic():
+            _, _, sender_id, item = heapq.heappop(self._due)
+            if isinstance(item, BaseMessage):
+                message = item
+            else:
+                message, _ = self.codec.decode_from(item, DELIVER_AT.size)
+            self.participant.receive_message(sender_id, message)
+
+    def _handle_command(self, command: tuple):
+        if command[0] == "key_gen":
+            # a fresh participant for every key generation
+            self.participant = Participant(self.participant_id, self.delegate, self.parameters)
+            start = time.monotonic()
+            self._operations[None] = (start, {})
+            self.participant.key_gen()
+            self._operations[None][1]["local"] = time.monotonic() - start
+
+        elif command[0] == "sign":
+            # sessions started together, so their messages can share envelopes
+            _, messages_by_session_id, signer_ids = command
+            if self.participant is None:
+                self.control.send(("error", self.participant_id, "Signing requested before key generation"))
+                return
+            with self.delegate.hold() if isinstance(self.delegate, BatchingDelegate) else nullcontext():
+                for session_id, message in messages_by_session_id.items():
+                    self._operations[session_id] = (time.monotonic(), {})
+                    self.participant.prepare_for_signing(message, signer_ids, session_id)
+                    self.participant.sign(session_id=session_id)
+
+    def _report_progress(self):
+        if self.participant is None:
+            return
+
+        for operation, (start, milestones) in list(self._operations.items()):
+            if operation is None:
+                state = self.participant.key_gen_state
+                reached = {
+                    "broadcast": len(state.other_y_by_id) == self.parameters.party_size,
+                    "p2p": state.x is not None
+                }
+            else:
+                state = self.participant.signing_sessions.get(operation)
+                if state is None:
+                    # dropped by the participant, past max_signing_sessions or signing_session_ttl
+                    del self._operations[operation]
+                    self.control.send(("error", self.participant_id, f'Signing session {operation} was dropped before it completed'))
+                    continue
+                reached = {
+                    "mtoa": state.delta_i is not None,
+                    "delta": state.little_r is not None,
+                    "shares": len(state.s_by_id) == len(state.signer_ids)
+                }
+
+            for milestone, is_reached in reached.items():
+                if is_reached and milestone not in milestones:
+                    milestones[milestone] = time.monotonic() - start
+
+            if all(reached.values()):
+                del self._operations[operation]
+                if operation is None:
+                    self.control.send(("key_gen", self.participant_id, milestones, self.participant.public_key()))
+                else:
+                    self.control.send(("sign", self.participant_id, milestones, operation, self.participant.signature(operation)))
+
+def _run_node(
+    participant_id: int,
+    parameters: Parameters,
+    peers: Mapping[int, Connection],
+    control: Connection,
+    link: LinkProfile,
+    batching: bool
+):
+    _Node(participant_id, parameters, dict(peers), control, link, batching).run()
+
+class LocalCluster:
+    """
+        One process per participant, connected pairwise by pipes carrying wire encoded
+        messages. Every link delays frames by link.latency, plus their size over
+        link.bandwidth, queued behind whatever else is on that link. With batching, each
+        participant sends through a BatchingDelegate.
+
+        Processes are started with the "spawn" method, so this is safe to use from
+        programs that already run threads.
+    """
+
+    def __init__(self, parameters: Parameters, link: Optional[LinkProfile] = None, batching: bool = False):
+        self.parameters = parameters
+        self.link = link if link is not None else LinkProfile()
+        self.batching = batching
+        self._processes: List[multiprocessing.Process] = []
+        self._controls: Dict[int, Connection] = {}
+        self._next_session_id = 1
+
+    def __enter__(self) -> "LocalCluster":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        party_ids = range(1, self.parameters.party_size + 1)
+
+        peers: Dict[int, Dict[int, Connection]] = { each: {} for each in party_ids }
+        for i in party_ids:
+            for j in party_ids:
+                if i < j:
+                    peers[i][j], peers[j][i] = context.Pipe()
+
+        for participant_id in party_ids:
+            self._controls[participant_id], child_control = context.Pipe()
+            process = context.Process(
+                target=_run_node,
+                args=(participant_id, self.parameters, peers[participant_id], child_control, self.link, self.batching),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+            child_control.close()
+
+        # the children have their own copies now
+        for each in peers.values():
+            for connection in each.values():
+                connection.close()
+
+    def close(self):
+        for control in self._controls.values():
+            try:
+                control.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._controls = {}
+
+    def key_gen(self) -> KeyGenResult:
+        start = time.monotonic()
+        for control in self._controls.values():
+            control.send(("key_gen",))
+
+        reports = self._collect("key_gen", len(self._controls))
+        public_keys = [ each[2] for each in reports ]
+        if any(each != public_keys[0] for each in public_keys):
+            raise PyTSSError("Participants disagree on the public key")
+
+        return KeyGenResult(public_keys[0], time.monotonic() - start, self._slowest(KEY_GEN_ROUNDS, reports))
+
+    def sign(self, messages: List[int], signer_ids: Optional[Set[int]] = None, concurrency: int = 1) -> List[SigningResult]:
+        """
+            Signs each message with signer_ids (the first `threshold` participants by
+            default), running up to `concurrency` signing sessions at once.
+        """
+        if concurrency > self.parameters.max_signing_sessions:
+            raise ValueError(f'Concurrency {concurrency} is more than max_signing_sessions ({self.parameters.max_signing_sessions})')
+
+        signer_ids = signer_ids if signer_ids is not None else set(range(1, self.parameters.threshold + 1))
+        results = []
+        for i in range(0, len(messages), concurrency):
+            messages_by_session_id = {}
+            for message in messages[i:i + concurrency]:
+                messages_by_session_id[self._next_session_id] = message
+                self._next_session_id += 1
+
+            start = time.monotonic()
+            for participant_id in signer_ids:
+                self._controls[participant_id].send(("sign", messages_by_session_id, signer_ids))
+
+            reports = self._collect("sign", len(messages_by_session_id) * len(signer_ids))
+            for session_id, message in messages_by_session_id.items():
+                session_reports = [ each for each in reports if each[2] == session_id ]
+                signature = session_reports[0][3]
+                results.append(SigningResult(
+                    session_id,
+                    message,
+                    signature,
+                    max(each[-1] for each in session_reports) - start,
+                    self._slowest(SIGNING_ROUNDS, session_reports)
+                ))
+
+        return results
+
+    def _collect(self, kind: str, count: int) -> List[tuple]:
+        # reports, without their kind, along with when each arrived
+        reports = []
+        while len(reports) < count:
+            for connection in wait(list(self._controls.values())):
+                report = connection.recv()
+                if report[0] == "error":
+                    raise PyTSSError(f'Participant {report[1]} failed:\n{report[2]}')
+                assert report[0] == kind
+                reports.append((*report[1:], time.monotonic()))
+
+        return reports
+
+    def _slowest(self, rounds: List[str], reports: List[tuple]) -> Dict[str, float]:
+        # each round's duration for every participant, then the longest
+        slowest = {}
+        for report in reports:
+            milestones = report[1]
+            previous = 0.0
+            for each in rounds:
+                slowest[each] = max(slowest.get(each, 0.0), milestones[each] - previous)
+                previous = milestones[each]
+
+        return slowest
+
+def run(
+    parameters: Parameters,
+    keygens: int = 1,
+    signings: int = 10,
+    link: Optional[LinkProfile] = None,
+    batching: bool = False,
+    concurrency: int = 1
+) -> Tuple[List[KeyGenResult], List[SigningResult]]:
+    # Signs with the key from the last key generation, and verifies every signature
+    key_gen_results: List[KeyGenResult] = []
+    signing_results: List[SigningResult] = []
+
+    with LocalCluster(parameters, link, batching) as cluster:
+        for _ in range(keygens):
+            key_gen_results.append(cluster.key_gen())
+
+        messages = [ gen_random_int(0, 2 ** parameters.security_parameter) for _ in range(signings) ]
+        signing_results = cluster.sign(messages, concurrency=concurrency)
+
+    public_key: Point = key_gen_results[-1].public_key
+    for each in signing_results:
+        if not each.signature.verify(each.message, public_key):
+            raise PyTSSError(f'Invalid signature in session {each.session_id}')
+
+    return key_gen_results, signing_results
+
+def _print_timings(title: str, rounds: List[str], results: list):
+    print(f'{title:<12}{"total":>10}' + ''.join(f'{each:>10}' for each in rounds) + '   (ms)')
+    for i, result in enumerate(results):
+        print(f'{i + 1:<12}{result.seconds * 1000:>10.1f}' + ''.join(f'{result.rounds[each] * 1000:>10.1f}' for each in rounds))
+    if len(results) > 1:
+        mean = lambda values: sum(values) / len(values) * 1000
+        print(f'{"mean":<12}{mean([ each.seconds for each in results ]):>10.1f}' + ''.join(
+            f'{mean([ result.rounds[each] for result in results ]):>10.1f}' for each in rounds
+        ))
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs GG20 key generation and signing with one process per participant")
+    parser.add_argument("--parties", type=int, default=3)
+    parser.add_argument("--threshold", type=int, default=2)
+    parser.add_argument("--paillier-bits", type=int, default=2048)
+    parser.add_argument("--keygens", type=int, default=1)
+    parser.add_argument("--signings", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1, help="signing sessions in flight at once")
+    parser.add_argument("--latency", type=float, default=0.0, help="one way link latency, in seconds")
+    parser.add_argument("--bandwidth", type=float, default=None, help="link bandwidth, in bytes per second")
+    parser.add_argument("--batching", action="store_true")
+    args = parser.parse_args()
+
+    parameters = Parameters(
+        security_parameter=256,
+        paillier_security_parameter=args.paillier_bits,
+        party_size=args.parties,
+        threshold=args.threshold,
+        ec=secp256k1,
+        ec_g=secp256k1_generator,
+        ec_n=secp256k1_order
+    )
+    key_gen_results, signing_results = run(
+        parameters,
+        args.keygens,
+        args.signings,
+        LinkProfile(args.latency, args.bandwidth),
+        args.batching,
+        args.concurrency
+    )
+
+    _print_timings("key gen", KEY_GEN_ROUNDS, key_gen_results)
+    print()
+    _print_timings("signing", SIGNING_ROUNDS, signing_results)
+
+if __name__ == '__main__':
+    main()
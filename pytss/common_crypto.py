@@ -1,7 +1,18 @@
 import secrets
 import random
-from typing import List
+from typing import Callable, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import hashlib
+import hmac
+from functools import lru_cache
+from itertools import compress
+from math import isqrt
+from .common_math import (
+    jacobi_symbol
+)
+from .errors import (
+    ErrorUnsealing
+)
 
 INITIAL_PRIMES = [
     2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 
@@ -20,21 +31,133 @@ INITIAL_PRIMES = [
 ]
 
 MILLER_RABIN_ROUNDS = 25
+# Minimum Miller-Rabin rounds for random candidates of at least this many bits, after 
+# FIPS 186-5 Table B.1; smaller candidates get MILLER_RABIN_ROUNDS
+MILLER_RABIN_ROUNDS_BY_BITS = [
+    (1536, 3),
+    (1024, 4),
+    (512, 7)
+]
+# Odd candidates tried per (bounded) prime search; about 3x the expected gap between 
+# primes at 1024 bits
+PRIME_SEARCH_CANDIDATES = 1024
+# Candidates are sieved by every prime below this before any Miller-Rabin test
+DEFAULT_SIEVE_BOUND = 2 ** 16
+
+SEALING_SALT_BYTES = 16
+SEALING_NONCE_BYTES = 16
+SEALING_TAG_BYTES = 32
 
 def gen_random_int(lower, upper) -> int:
     return random.randint(lower, upper - 1)
 
-def prime_of_n_bits(n) -> int:     
-    candidate = secrets.randbits(n)
-    while not is_prime(candidate):
-        if candidate % 2 == 0:
-            candidate += 1
-        else:
-            candidate += 2
+def prime_of_n_bits(n, top_bits=1, sieve_bound=DEFAULT_SIEVE_BOUND, baillie_psw=False) -> int:
+    """
+        Random prime of exactly n bits, whose top `top_bits` bits are all set. With top_bits=2, 
+        the product of two such primes is guaranteed to have exactly 2n bits.
+    """
+    prime = None
+    while prime is None:
+        prime = search_prime_of_n_bits(n, top_bits, PRIME_SEARCH_CANDIDATES, sieve_bound, baillie_psw)
+
+    return prime
+
+def search_prime_of_n_bits(
+    n, 
+    top_bits, 
+    max_candidates, 
+    sieve_bound=DEFAULT_SIEVE_BOUND, 
+    baillie_psw=False
+) -> Optional[int]:
+    """
+        Tries up to max_candidates consecutive odd candidates from a random start, returning 
+        None if none were prime. The start's residue modulo each odd prime below sieve_bound is 
+        computed once, and gives every candidate in the window divisible by that prime; only 
+        the survivors get a Miller-Rabin test.
+    """
+    start = secrets.randbits(n) | (((1 << top_bits) - 1) << (n - top_bits)) | 1
+    # stay within n bits
+    count = min(max_candidates, (((1 << n) - 1 - start) >> 1) + 1)
+
+    # sieve[i] is for the candidate start + 2i
+    sieve = bytearray(b"\x01") * count
+    for p in small_primes(sieve_bound):
+        if p >= start:
+            break
+        if p == 2:
+            continue
+
+        # first i with start + 2i == 0 (mod p)
+        i = ((p - start % p) * ((p + 1) >> 1)) % p
+        if i < count:
+            sieve[i::p] = bytes((count - 1 - i) // p + 1)
+
+    for i in compress(range(count), sieve):
+        candidate = start + 2 * i
+        if candidate <= INITIAL_PRIMES[-1]:
+            if candidate in INITIAL_PRIMES:
+                return candidate
+        elif is_probable_prime(candidate, baillie_psw=baillie_psw):
+            return candidate
+
+    return None
+
+@lru_cache(maxsize=None)
+def small_primes(bound) -> List[int]:
+    # Sieve of Eratosthenes, all primes below bound
+    if bound <= 2:
+        return []
+
+    sieve = bytearray(b"\x01") * bound
+    sieve[0] = sieve[1] = 0
+    for i in range(2, int(bound ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes((bound - 1 - i * i) // i + 1)
+
+    return list(compress(range(bound), sieve))
 
-    return candidate
+def parallel_primes_of_n_bits(
+    n, 
+    count, 
+    workers, 
+    top_bits=1, 
+    on_prime: Optional[Callable[[int], None]] = None,
+    sieve_bound=DEFAULT_SIEVE_BOUND,
+    baillie_psw=False
+) -> List[int]:
+    """
+        Finds `count` distinct n-bit primes by racing bounded searches across `workers` 
+        processes. Searches are resubmitted until enough primes turned up, at which 
+        point the rest are cancelled. on_prime is called as each prime is found.
+    """
+    primes = []
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = { 
+            executor.submit(search_prime_of_n_bits, n, top_bits, PRIME_SEARCH_CANDIDATES, sieve_bound, baillie_psw) for _ in range(workers) 
+        }
+        while len(primes) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                prime = future.result()
+                if prime is not None and prime not in primes and len(primes) < count:
+                    primes.append(prime)
+                    if on_prime is not None:
+                        on_prime(prime)
 
-def is_prime(candidate, miller_rabin_rounds=MILLER_RABIN_ROUNDS) -> bool:
+            while len(primes) < count and len(pending) < workers:
+                pending.add(executor.submit(search_prime_of_n_bits, n, top_bits, PRIME_SEARCH_CANDIDATES, sieve_bound, baillie_psw))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return primes
+
+def is_prime(candidate, miller_rabin_rounds=None, baillie_psw=False) -> bool:
+    """
+        Trial division by the primes below 1000, then either Miller-Rabin with random bases 
+        (miller_rabin_rounds defaults to the FIPS 186-5 count for the candidate's size) or, 
+        with baillie_psw=True, the Baillie-PSW test.
+    """
     if candidate <= INITIAL_PRIMES[-1]:
         return candidate in INITIAL_PRIMES
 
@@ -42,9 +165,33 @@ def is_prime(candidate, miller_rabin_rounds=MILLER_RABIN_ROUNDS) -> bool:
         if candidate % p == 0:
             return False
 
+    return is_probable_prime(candidate, miller_rabin_rounds, baillie_psw)
+
+def is_probable_prime(candidate, miller_rabin_rounds=None, baillie_psw=False) -> bool:
+    # Odd candidate above INITIAL_PRIMES, already trial divided
+    if baillie_psw:
+        return strong_probable_prime(candidate, 2) and strong_lucas_probable_prime(candidate)
+
+    if miller_rabin_rounds is None:
+        miller_rabin_rounds = miller_rabin_rounds_for_bits(candidate.bit_length())
+
     return miller_rabin(candidate, miller_rabin_rounds)
 
+def miller_rabin_rounds_for_bits(bits) -> int:
+    for min_bits, rounds in MILLER_RABIN_ROUNDS_BY_BITS:
+        if bits >= min_bits:
+            return rounds
+
+    return MILLER_RABIN_ROUNDS
+
 def miller_rabin(candidate, rounds) -> bool:
+    for _ in range(rounds): 
+        if not strong_probable_prime(candidate, random.randint(2, candidate - 2)):
+            return False
+
+    return True
+
+def strong_probable_prime(candidate, base) -> bool:
     d = candidate - 1
     r = 0
 
@@ -52,23 +199,100 @@ def miller_rabin(candidate, rounds) -> bool:
         d //= 2
         r += 1
 
-    for _ in range(rounds): 
-        rand_witness = random.randint(2, candidate-2)
-        x = pow(rand_witness, d, candidate)
-
-        if x != 1:
-            i = 0
-            while x != (candidate - 1):
-                if i == r - 1:
-                    return False
-                else:
-                    i = i + 1
-                    x = (x ** 2) % candidate
+    x = pow(base, d, candidate)
+    if x == 1 or x == candidate - 1:
+        return True
 
-    return True
+    for _ in range(r - 1):
+        x = x * x % candidate
+        if x == candidate - 1:
+            return True
+
+    return False
+
+def strong_lucas_probable_prime(candidate) -> bool:
+    """
+        Strong Lucas test with Selfridge's parameters: D is the first of 5, -7, 9, -11, ... 
+        with Jacobi symbol (D/candidate) = -1, P = 1 and Q = (1 - D) / 4.
+    """
+    if isqrt(candidate) ** 2 == candidate:
+        return False
+
+    D = 5
+    while True:
+        jacobi = jacobi_symbol(D, candidate)
+        if jacobi == -1:
+            break
+        if jacobi == 0 and abs(D) != candidate:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+
+    P, Q = 1, (1 - D) // 4
+
+    d = candidate + 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    def halve(x):
+        x %= candidate
+        return (x + candidate if x & 1 else x) >> 1
+
+    # U_k, V_k and Q^k from k = 1, walking down the bits of d
+    U, V, Q_k = 1, P, Q % candidate
+    for bit in bin(d)[3:]:
+        U = U * V % candidate
+        V = (V * V - 2 * Q_k) % candidate
+        Q_k = Q_k * Q_k % candidate
+        if bit == "1":
+            U, V = halve(P * U + V), halve(D * U + P * V)
+            Q_k = Q_k * Q % candidate
+
+    if U == 0 or V == 0:
+        return True
+
+    for _ in range(s - 1):
+        V = (V * V - 2 * Q_k) % candidate
+        if V == 0:
+            return True
+        Q_k = Q_k * Q_k % candidate
+
+    return False
 
 def sha256_values(values: List[int]) -> int:
     hash_delimeter = "#"
     hashable_bytes = hash_delimeter.join([ str(each) for each in values ]).encode()
     return int.from_bytes(hashlib.sha256(hashable_bytes).digest(), byteorder='big')
     
+
+def derive_sealing_key(passphrase: bytes, salt: bytes) -> bytes:
+    # scrypt, 64 bytes: the first half keys the keystream, the second half the MAC
+    return hashlib.scrypt(passphrase, salt=salt, n=2 ** 14, r=8, p=1, dklen=64)
+
+def seal(key: bytes, plaintext: bytes) -> bytes:
+    """
+        Authenticated encryption with the standard library only: plaintext XOR a SHAKE-256 
+        keystream over (key, random nonce), then HMAC-SHA256 over nonce and ciphertext. 
+        Output is nonce || ciphertext || tag.
+    """
+    nonce = secrets.token_bytes(SEALING_NONCE_BYTES)
+    ciphertext = _xor_keystream(key[:32], nonce, plaintext)
+    tag = hmac.new(key[32:], nonce + ciphertext, hashlib.sha256).digest()
+    return nonce + ciphertext + tag
+
+def unseal(key: bytes, sealed: bytes) -> bytes:
+    if len(sealed) < SEALING_NONCE_BYTES + SEALING_TAG_BYTES:
+        raise ErrorUnsealing("Sealed data is truncated")
+
+    nonce = sealed[:SEALING_NONCE_BYTES]
+    ciphertext = sealed[SEALING_NONCE_BYTES:-SEALING_TAG_BYTES]
+    tag = hmac.new(key[32:], nonce + ciphertext, hashlib.sha256).digest()
+    if not hmac.compare_digest(tag, sealed[-SEALING_TAG_BYTES:]):
+        raise ErrorUnsealing("Sealed data failed authentication: wrong key, or it was tampered with")
+
+    return _xor_keystream(key[:32], nonce, ciphertext)
+
+def _xor_keystream(key: bytes, nonce: bytes, data: bytes) -> bytes:
+    keystream = hashlib.shake_256(key + nonce).digest(len(data))
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
@@ -18,13 +18,50 @@ def extended_euclidian(a, b):
     return ExtendedEuclidianResult(old_s, old_t, old_r)
 
 def compute_modular_inverse(a, modulo_base):
-    ee_result = extended_euclidian(a, modulo_base)
-    return ee_result.bezout_x % modulo_base
+    # Raises ValueError when a has no inverse, i.e. gcd(a, modulo_base) != 1
+    return pow(a, -1, modulo_base)
+
+def batch_modular_inverse(values, modulo_base):
+    # Montgomery's trick: invert the running product of all values once, then walk 
+    # back through the prefix products to peel off each individual inverse
+    prefix_products = []
+    acc = 1
+    for value in values:
+        acc = (acc * value) % modulo_base
+        prefix_products.append(acc)
+
+    if not prefix_products:
+        return []
+
+    acc_inv = compute_modular_inverse(acc, modulo_base)
+    inverses = [0] * len(prefix_products)
+    for i in range(len(prefix_products) - 1, 0, -1):
+        inverses[i] = (acc_inv * prefix_products[i - 1]) % modulo_base
+        acc_inv = (acc_inv * values[i]) % modulo_base
+    inverses[0] = acc_inv
+
+    return inverses
 
 def legendre_symbol(a, p):
     ls = pow(a, (p - 1) // 2, p)
     return -1 if ls == p - 1 else ls
 
+def jacobi_symbol(a, n):
+    # n odd and positive; equals the Legendre symbol when n is prime
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+
+    return result if n == 1 else 0
+
 def compute_modular_sqrt(a, modulo_base):
     if legendre_symbol(a, modulo_base) != 1:
         return 0
@@ -0,0 +1,79 @@
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+import abc
+from .elliptic_curve import (
+    Point
+)
+from .paillier import (
+    PaillierPublicKey,
+    PaillierPrivateKey
+)
+
+# Module level, so they can be pickled over to worker processes
+def _encrypt(public_key: PaillierPublicKey, pt: int) -> int:
+    return public_key.encrypt(pt)
+
+def _decrypt(private_key: PaillierPrivateKey, ct: int) -> int:
+    return private_key.decrypt(ct)
+
+def _homomorphic_multiply(public_key: PaillierPublicKey, ct: int, pt: int) -> int:
+    return public_key.homomorphic_multiply(ct, pt)
+
+def _scalar_multiply(scalar: int, point: Point) -> Point:
+    return scalar * point
+
+# Where the heavy Paillier and EC operations of the protocol get computed
+class ComputeBackend(metaclass=abc.ABCMeta):
+
+    @abc.abstractmethod
+    def submit(self, fn: Callable, *args) -> Future:
+        raise NotImplementedError
+
+    def map(self, fn: Callable, args_list: Iterable[Tuple]) -> List[Any]:
+        # Submits everything before waiting on anything; results come back in submission order
+        futures = [ self.submit(fn, *args) for args in args_list ]
+        return [ each.result() for each in futures ]
+
+    def close(self):
+        pass
+
+    def encrypt(self, public_key: PaillierPublicKey, pt: int) -> Future:
+        # With precomputed masks, encrypting is cheaper than shipping the work elsewhere
+        if public_key.randomness_pool is not None:
+            return _completed(public_key.encrypt(pt))
+        return self.submit(_encrypt, public_key, pt)
+
+    def decrypt(self, private_key: PaillierPrivateKey, ct: int) -> Future:
+        return self.submit(_decrypt, private_key, ct)
+
+    def homomorphic_multiply(self, public_key: PaillierPublicKey, ct: int, pt: int) -> Future:
+        return self.submit(_homomorphic_multiply, public_key, ct, pt)
+
+    def scalar_multiply(self, scalar: int, point: Point) -> Future:
+        return self.submit(_scalar_multiply, scalar, point)
+
+# Runs everything right away, in the calling thread
+class InlineComputeBackend(ComputeBackend):
+
+    def submit(self, fn: Callable, *args) -> Future:
+        return _completed(fn(*args))
+
+class ProcessPoolComputeBackend(ComputeBackend):
+    """
+        Runs operations on a pool of worker processes, so that concurrent signing sessions 
+        (e.g. driven from several threads, or by gg20_async) aren't all serialized on the GIL.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        return self.executor.submit(fn, *args)
+
+    def close(self):
+        self.executor.shutdown()
+
+def _completed(result: Any) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
@@ -1,5 +1,6 @@
 from collections import namedtuple
 from dataclasses import dataclass
+from typing import List, Optional, Tuple
 from .common_crypto import (
     gen_random_int
 )
@@ -8,9 +9,14 @@ from .utils import (
 )
 from .common_math import (
     compute_modular_sqrt,
-    compute_modular_inverse
+    compute_modular_inverse,
+    batch_modular_inverse,
+    legendre_symbol
 )
 
+DEFAULT_WNAF_WIDTH = 5
+PIPPENGER_THRESHOLD = 128
+
 @dataclass
 class PrimeGaloisField:
     prime: int
@@ -20,6 +26,8 @@ class PrimeGaloisField:
 
 @dataclass
 class FieldElement:
+    __slots__ = ("value", "field")
+
     value: int
     field: PrimeGaloisField
 
@@ -72,8 +80,8 @@ class EllipticCurve:
     field: PrimeGaloisField
     
     def __contains__(self, point: "Point") -> bool:
-        x, y = point.x, point.y
-        return y ** 2 == x ** 3 + self.a * x + self.b
+        x, y, p = point.x.value, point.y.value, self.field.prime
+        return (y * y - x * x * x - self.a.value * x - self.b.value) % p == 0
 
     def __post_init__(self):
         if not isinstance(self.a, FieldElement):
@@ -87,6 +95,8 @@ class EllipticCurve:
 
 @dataclass
 class Point:
+    __slots__ = ("x", "y", "curve", "_fixed_base_table")
+
     x: int
     y: int
 
@@ -102,86 +112,504 @@ class Point:
         if not isinstance(self.y, FieldElement):
             self.y = FieldElement(self.y, self.curve.field)
 
-        if self not in self.curve:
+        if not self.is_valid():
             raise ValueError
 
+    def is_valid(self) -> bool:
+        # Canonical coordinates of a finite point on the curve
+        if self.x is None or self.y is None:
+            return False
+        return self.x in self.curve.field and self.y in self.curve.field and self in self.curve
+
+    def __reduce__(self):
+        # The module's generator is pickled by reference, so it keeps its fixed-base table on 
+        # the other end; other points are pickled without theirs
+        if self is secp256k1_generator:
+            return "secp256k1_generator"
+        return (self._trusted, (
+            None if self.x is None else self.x.value, 
+            None if self.y is None else self.y.value, 
+            self.curve
+        ))
+
+    def to_sec1(self, compressed: bool = True) -> bytes:
+        # SEC1 2.3.3: 0x02/0x03 || x when compressed (the prefix gives y's parity), 0x04 || x || y otherwise
+        if self.x is None:
+            raise ValueError("The point at infinity has no fixed-width encoding")
+
+        size = _field_bytes(self.curve)
+        if compressed:
+            return bytes([2 | (self.y.value & 1)]) + self.x.value.to_bytes(size, 'big')
+        return b"\x04" + self.x.value.to_bytes(size, 'big') + self.y.value.to_bytes(size, 'big')
+
+    @classmethod
+    def from_sec1(cls, data, curve: EllipticCurve) -> "Point":
+        """
+            Inverse of to_sec1, data is any bytes-like object. Raises ValueError unless it's 
+            the encoding of a point on the curve.
+        """
+        size = _field_bytes(curve)
+        data = memoryview(data)
+        if len(data) == size + 1 and data[0] in (2, 3):
+            x = int.from_bytes(data[1:], 'big')
+            if x >= curve.field.prime or not _is_x_coordinate(x, curve):
+                raise ValueError("Not the x coordinate of a point on the curve")
+            return _lift_x(x, curve, data[0] & 1)
+        if len(data) == 2 * size + 1 and data[0] == 4:
+            return cls(int.from_bytes(data[1:size + 1], 'big'), int.from_bytes(data[size + 1:], 'big'), curve)
+
+        raise ValueError("Not a SEC1 encoded point")
+
+    @classmethod
+    def _trusted(cls, x: Optional[int], y: Optional[int], curve: EllipticCurve) -> "Point":
+        """
+            Builds a point from coordinates we computed ourselves, skipping the curve membership
+            check done by the regular constructor. Anything coming from outside (deserialized, 
+            received from another party) should go through Point(...) instead.
+        """
+        point = object.__new__(cls)
+        point.curve = curve
+        if x is None:
+            point.x = point.y = None
+        else:
+            point.x = FieldElement(x, curve.field)
+            point.y = FieldElement(y, curve.field)
+        return point
+
     def __add__(self, other):
-        I = infinity_point(self.curve)
-        if self == I:
+        if self.x is None:
             return other
 
-        if other == I:
+        if other.x is None:
             return self
 
-        if self.x == other.x and self.y == (-1 * other.y):
-            return I
-
-        if self.x != other.x:
-            x1, x2 = self.x, other.x
-            y1, y2 = self.y, other.y
-
-            s = (y2 - y1) / (x2 - x1)
-            x3 = s ** 2 - x1 - x2
-            y3 = s * (x1 - x3) - y1
-
-            return self.__class__(
-                x=x3.value,
-                y=y3.value,
-                curve=self.curve
-            )
-
-        if self == other and self.y is None:
-            return I
-
-        if self == other:
-            x1, y1, a = self.x, self.y, self.curve.a
+        return self._from_jacobian(
+            _jacobian_add(self._to_jacobian(), other._to_jacobian(), self.curve.a.value, self.curve.field.prime),
+            self.curve
+        )
 
-            s = (3 * x1 ** 2 + a) / (2 * y1)
-            x3 = s ** 2 - 2 * x1
-            y3 = s * (x1 - x3) - y1
+    def __neg__(self) -> "Point":
+        if self.x is None:
+            return self
 
-            return self.__class__(
-                x=x3.value,
-                y=y3.value,
-                curve=self.curve
-            )
+        return self._trusted(self.x.value, (-self.y.value) % self.curve.field.prime, self.curve)
 
     def __rmul__(self, scalar: int) -> "Point":
-        current = self
-        result = infinity_point(self.curve)
-        while scalar:
-            if scalar & 1: 
-                result = result + current
-            current = current + current
-            scalar >>= 1
+        return self.multiply(scalar)
+
+    def multiply(self, scalar: int, window_bits: int = DEFAULT_WNAF_WIDTH, constant_time: bool = False) -> "Point":
+        """
+            Scalar multiplication. By default uses the attached fixed-base table if there is 
+            one, and width-window_bits NAF otherwise. constant_time=True instead runs a Montgomery 
+            ladder over a fixed number of bits, so the sequence of group operations does not 
+            depend on the scalar (Python ints themselves are not constant-time).
+        """
+        if scalar < 0:
+            return -self.multiply(-scalar, window_bits, constant_time)
+
+        a, p = self.curve.a.value, self.curve.field.prime
+
+        if constant_time:
+            ladder_bits = max(p.bit_length(), scalar.bit_length())
+            return self._from_jacobian(_jacobian_ladder(self._to_jacobian(), scalar, ladder_bits, a, p), self.curve)
+
+        table = getattr(self, "_fixed_base_table", None)
+        if table is not None and table.covers(scalar):
+            return self._from_jacobian(table.multiply(scalar), self.curve)
+
+        if _uses_glv(self.curve):
+            terms = _glv_split_terms([(scalar, self._to_jacobian())], p)
+            return self._from_jacobian(_jacobian_straus(terms, window_bits, a, p), self.curve)
+
+        return self._from_jacobian(_jacobian_wnaf_multiply(self._to_jacobian(), scalar, window_bits, a, p), self.curve)
+
+    def precompute(self, window_bits: int = 4, scalar_bits: int = 256) -> "FixedBaseTable":
+        """
+            Attaches a fixed-base table to this point, so that subsequent scalar multiplications
+            of it only need table lookups and additions. The table itself is built lazily, on the 
+            first multiplication that uses it.
+        """
+        self._fixed_base_table = FixedBaseTable(self, window_bits, scalar_bits)
+        return self._fixed_base_table
+
+    def _to_jacobian(self) -> Tuple[int, int, int]:
+        if self.x is None:
+            return _JACOBIAN_INFINITY
+        return (self.x.value, self.y.value, 1)
+
+    @classmethod
+    def _from_jacobian(cls, point: Tuple[int, int, int], curve: EllipticCurve) -> "Point":
+        x, y, z = point
+        if not z:
+            return cls._trusted(None, None, curve)
+
+        p = curve.field.prime
+        z_inv = pow(z, -1, p)
+        z_inv_squared = (z_inv * z_inv) % p
+        return cls._trusted((x * z_inv_squared) % p, (y * z_inv_squared * z_inv) % p, curve)
+
+def wnaf(scalar: int, window_bits: int) -> List[int]:
+    """
+        Width-w non-adjacent form of a non-negative scalar, least significant digit first. 
+        Every non-zero digit is odd with absolute value < 2^(w-1), and any w consecutive 
+        digits contain at most one non-zero digit.
+    """
+    digits = []
+    full_window = 1 << window_bits
+    half_window = full_window >> 1
+    while scalar:
+        if scalar & 1:
+            digit = scalar & (full_window - 1)
+            if digit >= half_window:
+                digit -= full_window
+            scalar -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        scalar >>= 1
+
+    return digits
+
+# GLV endomorphism for secp256k1: (x, y) -> (beta * x, y) is the same as multiplying by 
+# lambda, so k * P can be split into k1 * P + k2 * (lambda * P) with k1, k2 of ~128 bits, 
+# halving the doubling chain. Decomposition constants from "Guide to Elliptic Curve 
+# Cryptography" (Hankerson, Menezes, Vanstone), algorithm 3.74.
+ENABLE_GLV = True
+
+_SECP256K1_P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+_SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_GLV_BETA = 0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE
+_GLV_A1 = 0x3086D221A7D46BCDE86C90E49284EB15
+_GLV_B1 = -0xE4437ED6010E88286F547FA90ABFE4C3
+_GLV_A2 = 0x114CA50F7A8E2F3F657C1108D9D44CFD8
+_GLV_B2 = _GLV_A1
+
+def _uses_glv(curve: "EllipticCurve") -> bool:
+    return (
+        ENABLE_GLV and 
+        curve.field.prime == _SECP256K1_P and 
+        curve.a.value == 0 and 
+        curve.b.value == 7
+    )
+
+def _glv_split(scalar: int) -> Tuple[int, int]:
+    # k == k1 + k2 * lambda (mod n)
+    n = _SECP256K1_N
+    scalar %= n
+    c1 = (_GLV_B2 * scalar + n // 2) // n
+    c2 = (-_GLV_B1 * scalar + n // 2) // n
+    k1 = scalar - c1 * _GLV_A1 - c2 * _GLV_A2
+    k2 = -c1 * _GLV_B1 - c2 * _GLV_B2
+    return k1, k2
+
+def _glv_split_terms(terms: List[Tuple[int, Tuple[int, int, int]]], p: int) -> List[Tuple[int, Tuple[int, int, int]]]:
+    split_terms = []
+    for scalar, point in terms:
+        x, y, z = point
+        k1, k2 = _glv_split(scalar)
+        for k, term_point in [(k1, point), (k2, ((_GLV_BETA * x) % p, y, z))]:
+            if k < 0:
+                split_terms.append((-k, _jacobian_negate(term_point, p)))
+            elif k:
+                split_terms.append((k, term_point))
+
+    return split_terms
+
+# Jacobian coordinates: (X, Y, Z) stands for the affine point (X / Z^2, Y / Z^3), and 
+# Z == 0 for the point at infinity. Chains of additions / doublings are done on plain 
+# ints in this representation, so only the final conversion back to affine needs a 
+# field inversion. 
+_JACOBIAN_INFINITY = (1, 1, 0)
+
+def _jacobian_negate(point: Tuple[int, int, int], p: int) -> Tuple[int, int, int]:
+    x, y, z = point
+    return (x, (-y) % p, z)
+
+def _jacobian_odd_multiples(point: Tuple[int, int, int], count: int, a: int, p: int) -> List[Tuple[int, int, int]]:
+    # [P, 3P, 5P, ...], the lookup table for wNAF digits
+    multiples = [point]
+    doubled = _jacobian_double(point, a, p)
+    for _ in range(count - 1):
+        multiples.append(_jacobian_add(multiples[-1], doubled, a, p))
+    return multiples
+
+def _jacobian_wnaf_multiply(point: Tuple[int, int, int], scalar: int, window_bits: int, a: int, p: int) -> Tuple[int, int, int]:
+    odd_multiples = _jacobian_odd_multiples(point, 1 << (window_bits - 2), a, p)
+
+    result = _JACOBIAN_INFINITY
+    for digit in reversed(wnaf(scalar, window_bits)):
+        result = _jacobian_double(result, a, p)
+        if digit > 0:
+            result = _jacobian_add(result, odd_multiples[digit >> 1], a, p)
+        elif digit < 0:
+            result = _jacobian_add(result, _jacobian_negate(odd_multiples[(-digit) >> 1], p), a, p)
+
+    return result
+
+def _jacobian_straus(terms: List[Tuple[int, Tuple[int, int, int]]], window_bits: int, a: int, p: int) -> Tuple[int, int, int]:
+    odd_multiples = [ _jacobian_odd_multiples(point, 1 << (window_bits - 2), a, p) for _, point in terms ]
+    digits = [ wnaf(scalar, window_bits) for scalar, _ in terms ]
+
+    result = _JACOBIAN_INFINITY
+    for i in range(max((len(each) for each in digits), default=0) - 1, -1, -1):
+        result = _jacobian_double(result, a, p)
+        for term_digits, multiples in zip(digits, odd_multiples):
+            if i >= len(term_digits):
+                continue
+            digit = term_digits[i]
+            if digit > 0:
+                result = _jacobian_add(result, multiples[digit >> 1], a, p)
+            elif digit < 0:
+                result = _jacobian_add(result, _jacobian_negate(multiples[(-digit) >> 1], p), a, p)
+
+    return result
+
+def _jacobian_pippenger(terms: List[Tuple[int, Tuple[int, int, int]]], a: int, p: int) -> Tuple[int, int, int]:
+    window_bits = max(2, len(terms).bit_length() - 3)
+    mask = (1 << window_bits) - 1
+    max_bits = max(scalar.bit_length() for scalar, _ in terms)
+
+    result = _JACOBIAN_INFINITY
+    for shift in range(((max_bits + window_bits - 1) // window_bits - 1) * window_bits, -1, -window_bits):
+        for _ in range(window_bits):
+            result = _jacobian_double(result, a, p)
+
+        buckets = [_JACOBIAN_INFINITY] * (mask + 1)
+        for scalar, point in terms:
+            digit = (scalar >> shift) & mask
+            if digit:
+                buckets[digit] = _jacobian_add(buckets[digit], point, a, p)
+
+        # sum(j * buckets[j]) via running sums, highest bucket first
+        running = total = _JACOBIAN_INFINITY
+        for bucket in reversed(buckets[1:]):
+            running = _jacobian_add(running, bucket, a, p)
+            total = _jacobian_add(total, running, a, p)
+
+        result = _jacobian_add(result, total, a, p)
+
+    return result
+
+def _jacobian_ladder(point: Tuple[int, int, int], scalar: int, bits: int, a: int, p: int) -> Tuple[int, int, int]:
+    # Montgomery ladder: every bit costs exactly one addition and one doubling
+    ladder = [_JACOBIAN_INFINITY, point]
+    for i in range(bits - 1, -1, -1):
+        bit = (scalar >> i) & 1
+        ladder[1 - bit] = _jacobian_add(ladder[0], ladder[1], a, p)
+        ladder[bit] = _jacobian_double(ladder[bit], a, p)
+
+    return ladder[0]
+
+def _jacobian_double(point: Tuple[int, int, int], a: int, p: int) -> Tuple[int, int, int]:
+    x1, y1, z1 = point
+    if not y1 or not z1:
+        return _JACOBIAN_INFINITY
+
+    yy = (y1 * y1) % p
+    s = (4 * x1 * yy) % p
+    m = 3 * x1 * x1
+    if a:
+        z1_squared = (z1 * z1) % p
+        m += a * z1_squared * z1_squared
+    m %= p
+
+    x3 = (m * m - 2 * s) % p
+    y3 = (m * (s - x3) - 8 * yy * yy) % p
+    z3 = (2 * y1 * z1) % p
+    return (x3, y3, z3)
+
+def _jacobian_add_affine(point_1: Tuple[int, int, int], point_2: Tuple[int, int], a: int, p: int) -> Tuple[int, int, int]:
+    # Mixed addition, where the second operand is an affine (Z == 1) point
+    x1, y1, z1 = point_1
+    x2, y2 = point_2
+    if not z1:
+        return (x2, y2, 1)
+
+    z1_squared = (z1 * z1) % p
+    u2 = (x2 * z1_squared) % p
+    s2 = (y2 * z1 * z1_squared) % p
+
+    h = (u2 - x1) % p
+    r = (s2 - y1) % p
+    if not h:
+        if not r:
+            return _jacobian_double(point_1, a, p)
+        return _JACOBIAN_INFINITY
+
+    hh = (h * h) % p
+    hhh = (h * hh) % p
+    v = (x1 * hh) % p
+
+    x3 = (r * r - hhh - 2 * v) % p
+    y3 = (r * (v - x3) - y1 * hhh) % p
+    z3 = (h * z1) % p
+    return (x3, y3, z3)
+
+def _jacobian_add(point_1: Tuple[int, int, int], point_2: Tuple[int, int, int], a: int, p: int) -> Tuple[int, int, int]:
+    x1, y1, z1 = point_1
+    x2, y2, z2 = point_2
+    if not z1:
+        return point_2
+    if not z2:
+        return point_1
+
+    z1_squared = (z1 * z1) % p
+    z2_squared = (z2 * z2) % p
+    u1 = (x1 * z2_squared) % p
+    u2 = (x2 * z1_squared) % p
+    s1 = (y1 * z2 * z2_squared) % p
+    s2 = (y2 * z1 * z1_squared) % p
+
+    h = (u2 - u1) % p
+    r = (s2 - s1) % p
+    if not h:
+        if not r:
+            return _jacobian_double(point_1, a, p)
+        return _JACOBIAN_INFINITY
+
+    hh = (h * h) % p
+    hhh = (h * hh) % p
+    v = (u1 * hh) % p
+
+    x3 = (r * r - hhh - 2 * v) % p
+    y3 = (r * (v - x3) - s1 * hhh) % p
+    z3 = (h * z1 * z2) % p
+    return (x3, y3, z3)
+
+class FixedBaseTable:
+    """
+        Fixed-base windowed table for a point P: row i holds j * 2^(window_bits * i) * P 
+        for every j < 2^window_bits, in affine coordinates. k * P is then the sum of one 
+        entry per window of k, i.e. scalar_bits / window_bits mixed additions and no doublings.
+    """
+
+    def __init__(self, point: Point, window_bits: int = 4, scalar_bits: int = 256):
+        self.point = point
+        self.window_bits = window_bits
+        self.scalar_bits = scalar_bits
+        self._rows = None
+
+    def covers(self, scalar: int) -> bool:
+        return 0 <= scalar and scalar.bit_length() <= self.scalar_bits
+
+    def multiply(self, scalar: int) -> Tuple[int, int, int]:
+        if self._rows is None:
+            self._rows = self._build_rows()
+
+        a, p = self.point.curve.a.value, self.point.curve.field.prime
+        mask = (1 << self.window_bits) - 1
+
+        result = _JACOBIAN_INFINITY
+        for row in self._rows:
+            if not scalar:
+                break
+            entry = row[scalar & mask]
+            if entry is not None:
+                result = _jacobian_add_affine(result, entry, a, p)
+            scalar >>= self.window_bits
+
         return result
 
+    def _build_rows(self) -> List[List[Optional[Tuple[int, int]]]]:
+        a, p = self.point.curve.a.value, self.point.curve.field.prime
+        row_count = (self.scalar_bits + self.window_bits - 1) // self.window_bits
+        row_size = 1 << self.window_bits
+
+        # Accumulate every entry in Jacobian form first, then normalize them all 
+        # to affine with a single batched inversion
+        jacobian_entries = []
+        base = self.point._to_jacobian()
+        for _ in range(row_count):
+            multiple = _JACOBIAN_INFINITY
+            for _ in range(1, row_size):
+                multiple = _jacobian_add(multiple, base, a, p)
+                jacobian_entries.append(multiple)
+            base = _jacobian_add(multiple, base, a, p)
+
+        finite_entries = [ each for each in jacobian_entries if each[2] ]
+        z_inverses = iter(batch_modular_inverse([ each[2] for each in finite_entries ], p))
+
+        rows = []
+        entries = iter(jacobian_entries)
+        for _ in range(row_count):
+            row = [None]
+            for _ in range(1, row_size):
+                x, y, z = next(entries)
+                if not z:
+                    row.append(None)
+                    continue
+                z_inv = next(z_inverses)
+                z_inv_squared = (z_inv * z_inv) % p
+                row.append(((x * z_inv_squared) % p, (y * z_inv_squared * z_inv) % p))
+            rows.append(row)
+
+        return rows
+
+def multi_scalar_mul(terms: List[Tuple[int, Point]], window_bits: int = DEFAULT_WNAF_WIDTH) -> Point:
+    """
+        Computes k1 * P1 + k2 * P2 + ... in one pass. Points carrying a fixed-base table 
+        are multiplied through it; the rest share a single doubling chain, using interleaved 
+        wNAF (Straus / Shamir's trick) for small batches and Pippenger's bucket method once 
+        there are at least PIPPENGER_THRESHOLD of them.
+    """
+    assert terms, "No terms to multiply"
+
+    curve = terms[0][1].curve
+    a, p = curve.a.value, curve.field.prime
+
+    result = _JACOBIAN_INFINITY
+    variable_base_terms = []
+    for scalar, point in terms:
+        if point.x is None or not scalar:
+            continue
+
+        if scalar < 0:
+            scalar, point = -scalar, -point
+
+        table = getattr(point, "_fixed_base_table", None)
+        if table is not None and table.covers(scalar):
+            result = _jacobian_add(result, table.multiply(scalar), a, p)
+        else:
+            variable_base_terms.append((scalar, point._to_jacobian()))
+
+    if _uses_glv(curve):
+        variable_base_terms = _glv_split_terms(variable_base_terms, p)
+
+    if len(variable_base_terms) >= PIPPENGER_THRESHOLD:
+        result = _jacobian_add(result, _jacobian_pippenger(variable_base_terms, a, p), a, p)
+    elif variable_base_terms:
+        result = _jacobian_add(result, _jacobian_straus(variable_base_terms, window_bits, a, p), a, p)
+
+    return Point._from_jacobian(result, curve)
+
 @dataclass
 class Signature:
     r: int
     s: int
     G: Point
     N: int
+    # parity of R.y, when the signer knows it
+    recovery_id: Optional[int] = None
 
     def verify(self, z: int, pub_key: Point) -> bool:
         s_inv = compute_modular_inverse(self.s, self.N)
-        u = (z * s_inv) % self.N
-        v = (self.r * s_inv) % self.N
-        
-        return (u*self.G + v*pub_key).x.value == self.r
+        return self._verify_with_s_inv(z, pub_key, s_inv)
 
     def recover_public_key(self, z: int) -> Point:
-        x = self.r
-        p = self.G.curve.field.prime
-
-        alpha = pow(x, 3, p) + self.G.curve.a.value * x + self.G.curve.b.value
-        alpha %= p
-
-        beta = compute_modular_sqrt(alpha, p)
-        y = beta if beta % 2 == 0 else p - beta
+        parity = 0 if self.recovery_id is None else self.recovery_id
+        r1: Point = _lift_x(self.r, self.G.curve, parity)
+        x_inv = compute_modular_inverse(self.r, self.N)
+        return multi_scalar_mul([
+            ((self.s * x_inv) % self.N, r1),
+            ((-z * x_inv) % self.N, self.G)
+        ])
+
+    def _verify_with_s_inv(self, z: int, pub_key: Point, s_inv: int) -> bool:
+        u = (z * s_inv) % self.N
+        v = (self.r * s_inv) % self.N
 
-        r1: Point = Point(x, y, self.G.curve)
-        return compute_modular_inverse(x, self.N) * (self.s * r1 + (-z % self.N) * self.G)
+        point = multi_scalar_mul([(u, self.G), (v, pub_key)])
+        return point.x is not None and point.x.value == self.r
 
     @property
     def formatted(self):
@@ -204,7 +632,92 @@ class PrivateKey:
         k_inv = pow(k, -1, self.N) 
         s = ((z + r*e) * k_inv) % self.N
         
-        return Signature(r, s, self.G, self.N)
+        return Signature(r, s, self.G, self.N, recovery_id=R.y.value & 1)
+
+BatchVerificationResult = namedtuple("BatchVerificationResult", "valid failed")
+RANDOMIZER_BITS = 128
+
+def verify_batch(items: List[Tuple[int, Signature, Point]]) -> BatchVerificationResult:
+    """
+        Verifies many (z, signature, public key) items at once. All s inverses come from
+        one batched inversion, and signatures carrying a recovery_id are checked together 
+        with a single randomized linear combination:
+
+            sum(a_i * u_i) * G + sum(a_i * v_i * Q_i) - sum(a_i * R_i) == infinity
+
+        If that combined check fails, or R can't be recovered, items are verified one by 
+        one. Returns whether everything verified, along with the indices that did not.
+    """
+    failed = []
+    s_inv_by_index = {}
+
+    indices_by_order = {}
+    for i, (_, signature, _) in enumerate(items):
+        if not (0 < signature.r < signature.N and 0 < signature.s < signature.N):
+            failed.append(i)
+            continue
+        indices_by_order.setdefault(signature.N, []).append(i)
+
+    for order, indices in indices_by_order.items():
+        s_inverses = batch_modular_inverse([ items[i][1].s for i in indices ], order)
+        s_inv_by_index.update(zip(indices, s_inverses))
+
+    combinable = []
+    individual = []
+    for i in sorted(s_inv_by_index):
+        signature = items[i][1]
+        if signature.recovery_id is not None and _is_x_coordinate(signature.r, signature.G.curve):
+            combinable.append(i)
+        else:
+            individual.append(i)
+
+    if combinable and not _verify_combination([ (items[i], s_inv_by_index[i]) for i in combinable ]):
+        individual.extend(combinable)
+
+    for i in individual:
+        z, signature, pub_key = items[i]
+        if not signature._verify_with_s_inv(z, pub_key, s_inv_by_index[i]):
+            failed.append(i)
+
+    failed.sort()
+    return BatchVerificationResult(not failed, failed)
+
+def _verify_combination(items: List[Tuple[Tuple[int, Signature, Point], int]]) -> bool:
+    # All items must share a group; otherwise just let them be verified individually
+    first_signature = items[0][0][1]
+    if any(signature.N != first_signature.N or signature.G != first_signature.G for (_, signature, _), _ in items):
+        return False
+
+    order = first_signature.N
+    generator_scalar = 0
+    terms = []
+    for i, ((z, signature, pub_key), s_inv) in enumerate(items):
+        randomizer = 1 if i == 0 else gen_random_int(1, 2 ** RANDOMIZER_BITS)
+        generator_scalar += randomizer * z * s_inv
+        terms.append(((randomizer * signature.r * s_inv) % order, pub_key))
+        terms.append((-randomizer, _lift_x(signature.r, signature.G.curve, signature.recovery_id)))
+
+    terms.append((generator_scalar % order, first_signature.G))
+    return multi_scalar_mul(terms).x is None
+
+def _is_x_coordinate(x: int, curve: EllipticCurve) -> bool:
+    p = curve.field.prime
+    alpha = (pow(x, 3, p) + curve.a.value * x + curve.b.value) % p
+    return alpha == 0 or legendre_symbol(alpha, p) == 1
+
+def _lift_x(x: int, curve: EllipticCurve, parity: int) -> Point:
+    p = curve.field.prime
+
+    alpha = pow(x, 3, p) + curve.a.value * x + curve.b.value
+    alpha %= p
+
+    beta = compute_modular_sqrt(alpha, p)
+    y = beta if beta % 2 == parity else p - beta
+
+    return Point(x, y, curve)
+
+def _field_bytes(curve: EllipticCurve) -> int:
+    return (curve.field.prime.bit_length() + 7) // 8
 
 def infinity_point(curve: EllipticCurve) -> Point:
     return Point(None, None, curve)
@@ -222,3 +735,6 @@ secp256k1_generator = Point(
 )
 
 secp256k1_order = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Scalar multiplications by the generator dominate key generation, signing and verification
+secp256k1_generator.precompute()
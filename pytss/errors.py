@@ -1,3 +1,11 @@
 
 class PyTSSError(Exception): pass
-class ErrorGeneratingPrime(PyTSSError): pass
\ No newline at end of file
+class ErrorGeneratingPrime(PyTSSError): pass
+class ErrorUnsealing(PyTSSError): pass
+class ErrorDecodingMessage(PyTSSError): pass
+
+class ErrorVerifyingShare(PyTSSError):
+    # Raised during key generation, naming the participants whose shares failed verification
+    def __init__(self, sender_ids):
+        self.sender_ids = sender_ids
+        super().__init__(f'Secret shares from participants {sender_ids} do not match their commitments')
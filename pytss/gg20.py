@@ -1,12 +1,15 @@
-from typing import List, Mapping, Optional, Tuple, Set
+from typing import Callable, List, Mapping, Optional, Tuple, Set
 import abc
 import logging
-from collections import namedtuple
+import time
+from collections import namedtuple, OrderedDict
 from .common_crypto import (
     gen_random_int
 )
 from .paillier import (
     PaillierPublicKey,
+    PaillierPrivateKey,
+    PaillierRandomnessPool,
     generate_key_pair
 )
 from .common_math import (
@@ -18,8 +21,18 @@ from .elliptic_curve import (
     Signature
 )
 from .secret_sharing import (
-    split_into_shares
+    lagrange_cache,
+    split_into_verifiable_shares,
+    verify_shares
 )
+from .compute import (
+    ComputeBackend,
+    InlineComputeBackend
+)
+from .errors import (
+    ErrorVerifyingShare
+)
+from contextlib import contextmanager
 from dataclasses import dataclass, replace, asdict
 
 # Implementation taken from https://eprint.iacr.org/2020/540.pdf
@@ -38,6 +51,21 @@ class Parameters:
     ec_g: Point
     ec_n: int
 
+    # Depth of the precomputed Paillier encryption mask pools, 0 disables them
+    paillier_randomness_pool_depth: int = 0
+    # Number of processes searching for the Paillier primes during key generation
+    paillier_keygen_workers: int = 1
+    # Maximum number of presignatures a participant holds at once
+    presignature_pool_size: int = 16
+    # Maximum number of signing sessions tracked at once, and how long (in seconds) 
+    # a session is kept around before being dropped
+    max_signing_sessions: int = 64
+    signing_session_ttl: float = 600.0
+
+# Signing messages are tagged with the session they belong to, so a participant can take 
+# part in many signing sessions at once. The default is used when the caller doesn't pick one.
+DEFAULT_SESSION_ID = 0
+
 # Message holders
 class BaseMessage: pass 
 
@@ -45,6 +73,8 @@ class BaseMessage: pass
 class KeyGenBroadcast(BaseMessage):
     y: Point
     paillier_pk: PaillierPublicKey
+    # Feldman commitments to the sender's sharing polynomial, commitments[0] == y
+    commitments: List[Point]
 
 @dataclass
 class KeyGenP2P(BaseMessage):
@@ -53,31 +83,43 @@ class KeyGenP2P(BaseMessage):
 @dataclass
 class MtoAP2P1(BaseMessage):
     encrypted_value: int
+    session_id: int = DEFAULT_SESSION_ID
 
 @dataclass
 class MtoAP2P1Response(BaseMessage):
     cipher_b: int
+    session_id: int = DEFAULT_SESSION_ID
 
 @dataclass
 class MtoABroadcast1(BaseMessage):
     gamma_elliptic: Point
+    session_id: int = DEFAULT_SESSION_ID
 
 @dataclass 
 class MtoAP2P2(BaseMessage):
     encrypted_value: int
+    session_id: int = DEFAULT_SESSION_ID
 
 @dataclass 
 class MtoAP2P2Response(BaseMessage):
     encrypted_value: int
+    session_id: int = DEFAULT_SESSION_ID
 
 @dataclass 
 class SigningPostMtoABroadcast(BaseMessage):
     delta_i: int
     gamma_elliptic: Point
+    session_id: int = DEFAULT_SESSION_ID
 
 @dataclass 
 class SigningShare(BaseMessage):
     share: int
+    session_id: int = DEFAULT_SESSION_ID
+
+# Several messages from one sender to one recipient (or to everyone), handled in order
+@dataclass
+class Envelope(BaseMessage):
+    messages: List[BaseMessage]
 
 # Class to facilitate broadcast messages as well as p2p    
 class CommunicationDelegate(metaclass=abc.ABCMeta): 
@@ -90,6 +132,61 @@ class CommunicationDelegate(metaclass=abc.ABCMeta):
     def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
         raise NotImplementedError
 
+    def flush(self, sender_id: int):
+        # Called whenever a participant is done sending for now, i.e. at the end of each 
+        # key_gen, signing or receive_message call; delegates that hold messages back send them here
+        pass
+
+class BatchingDelegate(CommunicationDelegate):
+    """
+        Holds back what each participant sends until it flushes, then passes it on to 
+        `delegate` as one Envelope per recipient, followed by one broadcast Envelope. 
+        Messages handled in one call go out together, so everything for one peer in a round 
+        -- across all the sessions that call touched -- is a single send; hold() defers the 
+        flushes to also coalesce several calls, e.g. starting many signing sessions at once.
+    """
+
+    def __init__(self, delegate: CommunicationDelegate):
+        self.delegate = delegate
+        self._sends: "OrderedDict[int, OrderedDict[int, List[BaseMessage]]]" = OrderedDict()
+        self._broadcasts: "OrderedDict[int, List[BaseMessage]]" = OrderedDict()
+        self._holds = 0
+
+    def broadcast(self, sender_id: int, message: BaseMessage):
+        self._broadcasts.setdefault(sender_id, []).append(message)
+
+    def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        self._sends.setdefault(sender_id, OrderedDict()).setdefault(recipient_id, []).append(message)
+
+    def flush(self, sender_id: int):
+        if self._holds:
+            return
+
+        # taken out before sending, as an in-process delegate may deliver (and so have the 
+        # recipient send and flush) synchronously
+        sends = self._sends.pop(sender_id, {})
+        broadcasts = self._broadcasts.pop(sender_id, [])
+
+        for recipient_id, messages in sends.items():
+            self.delegate.send(sender_id, recipient_id, self._envelope(messages))
+        if broadcasts:
+            self.delegate.broadcast(sender_id, self._envelope(broadcasts))
+        self.delegate.flush(sender_id)
+
+    @contextmanager
+    def hold(self):
+        self._holds += 1
+        try:
+            yield
+        finally:
+            self._holds -= 1
+            if not self._holds:
+                for sender_id in list(OrderedDict.fromkeys([*self._sends, *self._broadcasts])):
+                    self.flush(sender_id)
+
+    def _envelope(self, messages: List[BaseMessage]) -> BaseMessage:
+        return messages[0] if len(messages) == 1 else Envelope(messages)
+
 @dataclass
 class KeyGenState:
     paillier_public_key: PaillierPublicKey
@@ -106,6 +203,7 @@ class KeyGenState:
     other_y_by_id: Mapping[int, Point]
     other_shamir_shares_by_id: Mapping[int, int]
     other_paillier_public_keys_by_id: Mapping[int, PaillierPublicKey]
+    other_commitments_by_id: Mapping[int, List[Point]]
     
 @dataclass
 class SigningState:
@@ -125,6 +223,7 @@ class SigningState:
 
     sigma_i: int
     little_r: int
+    recovery_id: int
 
     s_by_id: int
 
@@ -134,17 +233,37 @@ class SigningState:
     mToA_outputs_as_initiator_2: Mapping[int, int]
     mToA_outputs_as_receiver_2: Mapping[int, int]
 
+    session_id: int = DEFAULT_SESSION_ID
+    created_at: float = 0.0
+
+# Output of the message independent (offline) part of signing
+@dataclass
+class Presignature:
+    session_id: int
+    signer_ids: Set[int]
+
+    k: int
+    sigma_i: int
+    little_r: int
+    recovery_id: int
+
+    # signature shares other signers sent before we used this presignature
+    s_by_id: Mapping[int, int]
+
 class Participant():
 
     def __init__(
         self,
         participant_id: int,
         delegate: CommunicationDelegate,
-        party_parameters: Parameters
+        party_parameters: Parameters,
+        compute_backend: Optional[ComputeBackend] = None
     ): 
         self.participant_id = participant_id
         self.delegate = delegate
         self.party_parameters = party_parameters
+        # Paillier and EC heavy lifting goes through here
+        self.compute_backend = compute_backend if compute_backend is not None else InlineComputeBackend()
 
         # Protocol state 
         # Key generation
@@ -159,21 +278,50 @@ class Participant():
             y=None,
             other_y_by_id={},
             other_shamir_shares_by_id={},
-            other_paillier_public_keys_by_id={}
+            other_paillier_public_keys_by_id={},
+            other_commitments_by_id={}
         )
 
-        # Signing 
-        self.signing_state: Optional[SigningState] = None
+        # Signing, keyed by session id
+        self.signing_sessions: "OrderedDict[int, SigningState]" = OrderedDict()
+        self.presignatures: "OrderedDict[int, Presignature]" = OrderedDict()
+
+        # MtoA messages that arrived before we set up the session they belong to, 
+        # along with when the first of them arrived
+        self._pending_signing_messages: "OrderedDict[int, Tuple[float, List[Tuple[int, BaseMessage]]]]" = OrderedDict()
+
+    @property
+    def signing_state(self) -> Optional[SigningState]:
+        # The most recently started signing session
+        return next(reversed(self.signing_sessions.values()), None)
 
     def _update_key_gen_state(self, **kwargs):
         self.key_gen_state = replace(self.key_gen_state, **kwargs)
 
-    def key_gen(self):
+    def key_gen(
+        self, 
+        paillier_key_source: Optional[Callable[[], Tuple[PaillierPublicKey, PaillierPrivateKey]]] = None
+    ):
+        """
+            paillier_key_source, e.g. PaillierKeyPool.take, supplies a ready-made Paillier key 
+            pair instead of generating one here.
+        """
         logger.debug(f'Partipant {self.participant_id}: generating key...')
         # Generate Paillier keypair
-        paillier_pub_key, paillier_sec_key = generate_key_pair(
-            self.party_parameters.paillier_security_parameter
-        )
+        if paillier_key_source is not None:
+            paillier_pub_key, paillier_sec_key = paillier_key_source()
+            assert paillier_pub_key.size == self.party_parameters.paillier_security_parameter, "Paillier key of the wrong size"
+        else:
+            paillier_pub_key, paillier_sec_key = generate_key_pair(
+                self.party_parameters.paillier_security_parameter,
+                workers=self.party_parameters.paillier_keygen_workers,
+                progress=self._log_paillier_key_gen_progress
+            )
+        if self.party_parameters.paillier_randomness_pool_depth:
+            paillier_pub_key.randomness_pool = PaillierRandomnessPool(
+                paillier_sec_key,
+                self.party_parameters.paillier_randomness_pool_depth
+            )
         self._update_key_gen_state(
             paillier_public_key=paillier_pub_key,
             paillier_secret_key=paillier_sec_key
@@ -185,11 +333,13 @@ class Participant():
             secret_key_share=secret_key_share
         )
 
-        # Split into t, n shamir shares 
-        shamir_shares = split_into_shares(
+        # Split into t, n shamir shares, committing to the polynomial so every 
+        # recipient can verify their share
+        shamir_shares, commitments = split_into_verifiable_shares(
             secret_key_share, 
             self.party_parameters.party_size, 
             self.party_parameters.threshold,
+            self.party_parameters.ec_g,
             self.party_parameters.ec_n
         )
 
@@ -197,18 +347,18 @@ class Participant():
             secret_key_shamir_shares=shamir_shares
         )
 
-        # Compute y for this participant
-        y = secret_key_share * self.party_parameters.ec_g
+        # y for this participant, secret share * EC generator point, is the 
+        # commitment to the constant term
+        y = commitments[0]
         self._update_key_gen_state(
             y=y
         )
 
         # broadcast and send 
-        # broadcast yi, public value, EC scalar multiplication value 
-        # of secret share * EC generator point
+        # broadcast yi, public value, along with the commitments
         self.delegate.broadcast(
             self.participant_id,
-            KeyGenBroadcast(y, paillier_pub_key)
+            KeyGenBroadcast(y, paillier_pub_key, commitments)
         )
 
         # P2P send shamir secret share of private key share
@@ -220,7 +370,12 @@ class Participant():
                 KeyGenP2P(shamir_share[1])
             )
 
+        self.delegate.flush(self.participant_id)
+
         
+    def _log_paillier_key_gen_progress(self, stage: str, elapsed: float):
+        logger.debug(f'Partipant {self.participant_id}: Paillier key generation, {stage} after {elapsed:.2f}s')
+
     def public_key(self) -> Point: 
         assert len(self.key_gen_state.other_y_by_id) == self.party_parameters.party_size
 
@@ -230,112 +385,311 @@ class Participant():
 
         return public_key
 
-    def signature(self) -> Signature:
-        assert len(self.signing_state.s_by_id) == len(self.signing_state.signer_ids)
+    def signature(self, session_id: Optional[int] = None) -> Signature:
+        signing_state = self.signing_state if session_id is None else self.signing_sessions[session_id]
+        assert len(signing_state.s_by_id) == len(signing_state.signer_ids)
 
-        r = self.signing_state.little_r
-        s = sum(self.signing_state.s_by_id.values())
+        r = signing_state.little_r
+        s = sum(signing_state.s_by_id.values()) % self.party_parameters.ec_n
 
         return Signature(
             r=r, 
             s=s, 
             G=self.party_parameters.ec_g, 
-            N=self.party_parameters.ec_n
+            N=self.party_parameters.ec_n,
+            recovery_id=signing_state.recovery_id
         )
 
     def receive_message(self, sender_id: int, message: BaseMessage):
+        for each in (message.messages if isinstance(message, Envelope) else [message]):
+            self._handle_message(sender_id, each)
+
+        self.delegate.flush(self.participant_id)
+
+    def _handle_message(self, sender_id: int, message: BaseMessage):
         if isinstance(message, KeyGenBroadcast):
+            self._validate_point(message.y)
+            for commitment in message.commitments:
+                self._validate_point(commitment)
+            if len(message.commitments) != self.party_parameters.threshold or message.commitments[0] != message.y:
+                raise ErrorVerifyingShare([sender_id])
+
             self.key_gen_state.other_y_by_id[sender_id] = message.y
-            self.key_gen_state.other_paillier_public_keys_by_id[sender_id] = message.paillier_pk
+            self.key_gen_state.other_paillier_public_keys_by_id[sender_id] = self._counterparty_paillier_key(sender_id, message.paillier_pk)
+            self.key_gen_state.other_commitments_by_id[sender_id] = message.commitments
+            self._finish_key_gen_if_ready()
 
         elif isinstance(message, KeyGenP2P):
             self.key_gen_state.other_shamir_shares_by_id[sender_id] = message.shamir_share
+            self._finish_key_gen_if_ready()
 
-            if len(self.key_gen_state.other_shamir_shares_by_id) == self.party_parameters.party_size:
-                self.key_gen_state.x = sum(self.key_gen_state.other_shamir_shares_by_id.values())
+        elif isinstance(message, (MtoAP2P1, MtoAP2P2)) and not self._is_signing_in_progress(message.session_id):
+            self._buffer_signing_message(sender_id, message)
 
         elif isinstance(message, MtoAP2P1):
-            if self.signing_state is None:
-                self._setup_signing()
-
+            signing_state = self.signing_sessions[message.session_id]
             sender_pk = self.key_gen_state.other_paillier_public_keys_by_id[sender_id]
 
             beta_prime = gen_random_int(1, 2 ** (5 * self.party_parameters.security_parameter))
             beta = (-1) * beta_prime % self.party_parameters.ec_n
 
-            cipher_b_left = sender_pk.homomorphic_multiply(message.encrypted_value, self.signing_state.gamma)
-            cipher_b = sender_pk.homomorphic_add(cipher_b_left, beta_prime)
+            cipher_b_left = self.compute_backend.homomorphic_multiply(sender_pk, message.encrypted_value, signing_state.gamma)
+            encrypted_beta_prime = self.compute_backend.encrypt(sender_pk, beta_prime)
+            cipher_b = sender_pk.homomorphic_add_encrypted(cipher_b_left.result(), encrypted_beta_prime.result())
             
-            self.signing_state.mToA_outputs_as_receiver_1[sender_id] = beta
+            signing_state.mToA_outputs_as_receiver_1[sender_id] = beta
             self.delegate.send(
                 self.participant_id,
                 sender_id,
-                MtoAP2P1Response(cipher_b)
+                MtoAP2P1Response(cipher_b, message.session_id)
             )
 
+            if self._did_finish_mtoa_sequences(signing_state):
+                self._continue_signing_post_mtoa(signing_state) 
+
         elif isinstance(message, MtoAP2P1Response):
-            decrypted = self.key_gen_state.paillier_secret_key.decrypt(message.cipher_b)
+            signing_state = self.signing_sessions.get(message.session_id)
+            if signing_state is None:
+                return
+
+            decrypted = self.compute_backend.decrypt(self.key_gen_state.paillier_secret_key, message.cipher_b).result()
             alpha = decrypted % self.party_parameters.ec_n
-            self.signing_state.mToA_outputs_as_initiator_1[sender_id] = alpha
+            signing_state.mToA_outputs_as_initiator_1[sender_id] = alpha
+
+            if self._did_finish_mtoa_sequences(signing_state):
+                self._continue_signing_post_mtoa(signing_state) 
 
         elif isinstance(message, MtoAP2P2):
+            signing_state = self.signing_sessions[message.session_id]
             sender_pk = self.key_gen_state.other_paillier_public_keys_by_id[sender_id]
 
             beta_prime = gen_random_int(1, 2 ** (5 * self.party_parameters.security_parameter))
             beta = (-1) * beta_prime % self.party_parameters.ec_n
 
-            cipher_b_left = sender_pk.homomorphic_multiply(message.encrypted_value, self.signing_state.w)
-            cipher_b = sender_pk.homomorphic_add(cipher_b_left, beta_prime)
+            cipher_b_left = self.compute_backend.homomorphic_multiply(sender_pk, message.encrypted_value, signing_state.w)
+            encrypted_beta_prime = self.compute_backend.encrypt(sender_pk, beta_prime)
+            cipher_b = sender_pk.homomorphic_add_encrypted(cipher_b_left.result(), encrypted_beta_prime.result())
             
-            self.signing_state.mToA_outputs_as_receiver_2[sender_id] = beta
+            signing_state.mToA_outputs_as_receiver_2[sender_id] = beta
             self.delegate.send(
                 self.participant_id,
                 sender_id,
-                MtoAP2P2Response(cipher_b)
+                MtoAP2P2Response(cipher_b, message.session_id)
             )
 
-            if self._did_finish_mtoa_2_sequences():
-                self._continue_signing_post_mtoa() 
+            if self._did_finish_mtoa_sequences(signing_state):
+                self._continue_signing_post_mtoa(signing_state) 
 
         elif isinstance(message, MtoAP2P2Response):
-            decrypted = self.key_gen_state.paillier_secret_key.decrypt(message.encrypted_value)
+            signing_state = self.signing_sessions.get(message.session_id)
+            if signing_state is None:
+                return
+
+            decrypted = self.compute_backend.decrypt(self.key_gen_state.paillier_secret_key, message.encrypted_value).result()
             alpha = decrypted % self.party_parameters.ec_n
-            self.signing_state.mToA_outputs_as_initiator_2[sender_id] = alpha
+            signing_state.mToA_outputs_as_initiator_2[sender_id] = alpha
 
-            if self._did_finish_mtoa_2_sequences():
-                self._continue_signing_post_mtoa() 
+            if self._did_finish_mtoa_sequences(signing_state):
+                self._continue_signing_post_mtoa(signing_state) 
 
         elif isinstance(message, SigningPostMtoABroadcast):
-            if not self.signing_state:
+            # not one of the signers, or a session we've dropped
+            signing_state = self.signing_sessions.get(message.session_id)
+            if not signing_state:
                 return 
 
-            if self.signing_state.gamma_elliptic_summation is None:
-                self.signing_state.gamma_elliptic_summation = Point(x=None, y=None, curve=self.party_parameters.ec)
+            self._validate_point(message.gamma_elliptic)
+            if signing_state.gamma_elliptic_summation is None:
+                signing_state.gamma_elliptic_summation = Point(x=None, y=None, curve=self.party_parameters.ec)
 
-            self.signing_state.gamma_elliptic_summation += message.gamma_elliptic
+            signing_state.gamma_elliptic_summation += message.gamma_elliptic
 
-            self.signing_state.delta_by_id[sender_id] = message.delta_i
-            if len(self.signing_state.delta_by_id) == len(self.signing_state.signer_ids):
-                self.signing_state.delta = sum(self.signing_state.delta_by_id.values()) % self.party_parameters.ec_n
-                self._produce_signature()
+            signing_state.delta_by_id[sender_id] = message.delta_i
+            if len(signing_state.delta_by_id) == len(signing_state.signer_ids):
+                signing_state.delta = sum(signing_state.delta_by_id.values()) % self.party_parameters.ec_n
+                self._produce_signature(signing_state)
 
         elif isinstance(message, SigningShare):
-            if not self.signing_state:
+            # a share for a presignature we haven't used yet
+            if message.session_id in self.presignatures:
+                self.presignatures[message.session_id].s_by_id[sender_id] = message.share
+                return
+
+            signing_state = self.signing_sessions.get(message.session_id)
+            if not signing_state:
                 return 
 
-            self.signing_state.s_by_id[sender_id] = message.share
+            signing_state.s_by_id[sender_id] = message.share
+
+    def _counterparty_paillier_key(self, sender_id: int, paillier_pk: PaillierPublicKey) -> PaillierPublicKey:
+        if sender_id == self.participant_id:
+            return paillier_pk
+
+        # Our own copy of the key, so the encryption mask pool belongs to us
+        counterparty_pk = PaillierPublicKey(paillier_pk.n, paillier_pk.size)
+        if self.party_parameters.paillier_randomness_pool_depth:
+            counterparty_pk.randomness_pool = PaillierRandomnessPool(
+                counterparty_pk,
+                self.party_parameters.paillier_randomness_pool_depth
+            )
+        return counterparty_pk
+
+    def _finish_key_gen_if_ready(self):
+        # Once every share and commitment is in, checks all the shares together and sums them into x
+        key_gen_state = self.key_gen_state
+        party_size = self.party_parameters.party_size
+        if len(key_gen_state.other_shamir_shares_by_id) != party_size or len(key_gen_state.other_commitments_by_id) != party_size:
+            return
+
+        bad_sender_ids = verify_shares(
+            self.participant_id,
+            {
+                sender_id: (share, key_gen_state.other_commitments_by_id[sender_id]) 
+                for sender_id, share in key_gen_state.other_shamir_shares_by_id.items()
+            },
+            self.party_parameters.ec_g,
+            self.party_parameters.ec_n
+        )
+        if bad_sender_ids:
+            raise ErrorVerifyingShare(bad_sender_ids)
+
+        key_gen_state.x = sum(key_gen_state.other_shamir_shares_by_id.values())
+
+    def _validate_point(self, point: Point):
+        # Points built locally skip curve membership checks, so anything received from 
+        # another party is checked here
+        if point.curve != self.party_parameters.ec or not point.is_valid():
+            raise ValueError(f'Partipant {self.participant_id}: received a point that is not on the curve')
+
+    def _did_finish_mtoa_sequences(self, signing_state: SigningState):
+        if signing_state.delta_i is not None:
+            return False
+
+        threshold = len(signing_state.signer_ids) - 1 # every p2p but themselves
+        return all(
+            len(each) == threshold for each in [
+                signing_state.mToA_outputs_as_initiator_1,
+                signing_state.mToA_outputs_as_receiver_1,
+                signing_state.mToA_outputs_as_initiator_2,
+                signing_state.mToA_outputs_as_receiver_2
+            ]
+        )
+
+    def _is_signing_in_progress(self, session_id: int) -> bool:
+        signing_state = self.signing_sessions.get(session_id)
+        return signing_state is not None and len(signing_state.s_by_id) < len(signing_state.signer_ids)
+
+    def _buffer_signing_message(self, sender_id: int, message: BaseMessage):
+        # Only the pending buffer is bounded here; buffering never makes way by dropping live sessions
+        self._expire_signing_sessions()
+
+        if message.session_id not in self._pending_signing_messages:
+            if len(self._pending_signing_messages) >= self.party_parameters.max_signing_sessions:
+                self._pending_signing_messages.popitem(last=False)
+            self._pending_signing_messages[message.session_id] = (time.monotonic(), [])
+
+        # every other party sends at most one MtoAP2P1 and one MtoAP2P2 per session
+        pending_messages = self._pending_signing_messages[message.session_id][1]
+        if len(pending_messages) >= 2 * (self.party_parameters.party_size - 1):
+            logger.debug(f'Partipant {self.participant_id}: too many early messages for signing session {message.session_id}, dropping one')
+            return
+        pending_messages.append((sender_id, message))
+
+    def _expire_signing_sessions(self):
+        # Drop abandoned sessions and buffered messages
+        expiry = time.monotonic() - self.party_parameters.signing_session_ttl
+
+        for session_id in [ each.session_id for each in self.signing_sessions.values() if each.created_at < expiry ]:
+            logger.debug(f'Partipant {self.participant_id}: dropping expired signing session {session_id}')
+            del self.signing_sessions[session_id]
 
-    def _did_finish_mtoa_2_sequences(self):
-        threshold = len(self.signing_state.signer_ids) - 1 # every p2p but themselves
-        return len(self.signing_state.mToA_outputs_as_receiver_2) == threshold and len(self.signing_state.mToA_outputs_as_initiator_2) == threshold
+        for session_id in [ session_id for session_id, (created_at, _) in self._pending_signing_messages.items() if created_at < expiry ]:
+            del self._pending_signing_messages[session_id]
 
-    def prepare_for_signing(self, message: int, signer_ids: Set[int]):
-        assert self.signing_state is None 
+    def prepare_for_signing(self, message: Optional[int], signer_ids: Set[int], session_id: int = DEFAULT_SESSION_ID):
+        self._prepare_for_signing(message, signer_ids, session_id)
+        self.delegate.flush(self.participant_id)
 
-        logger.debug(f'Partipant {self.participant_id}: setting uup signing parameters')
+    def _prepare_for_signing(self, message: Optional[int], signer_ids: Set[int], session_id: int):
+        assert not self._is_signing_in_progress(session_id)
+
+        logger.debug(f'Partipant {self.participant_id}: setting uup signing parameters for session {session_id}')
 
         # reset signing state 
-        self.signing_state = SigningState(
+        signing_state = self._new_signing_state(message, signer_ids, session_id)
+
+        # Convert (t, n) private share x_i of x into a (t, t+1) share of x, w_i, where 
+        # sum(all(w_i)) == x (private key)
+        q = self.party_parameters.ec_n
+
+        w = (self.key_gen_state.x * lagrange_cache.coefficient(signer_ids, self.participant_id, q)) % q
+            
+        signing_state.w = w
+        signing_state.k = gen_random_int(1, self.party_parameters.ec_n)
+        signing_state.gamma = gen_random_int(1, self.party_parameters.ec_n)
+        signing_state.gamma_elliptic = self.compute_backend.scalar_multiply(signing_state.gamma, self.party_parameters.ec_g).result()
+
+        # Handle MtoA requests from signers who got ahead of us
+        _, pending_messages = self._pending_signing_messages.pop(session_id, (None, []))
+        for sender_id, pending_message in pending_messages:
+            self._handle_message(sender_id, pending_message)
+
+    def presign(self, signer_ids: Set[int], session_id: int):
+        """
+            Runs everything in signing that doesn't depend on the message -- both MtoA 
+            sequences and the delta round that fixes R -- and keeps the result as a 
+            presignature. All signers must use the same session_id; once all of them 
+            have presigned, sign(message, session_id) needs only one broadcast round.
+        """
+        assert len(self.presignatures) < self.party_parameters.presignature_pool_size, "Presignature pool is full"
+        assert session_id not in self.presignatures
+
+        self._prepare_for_signing(None, signer_ids, session_id)
+        self._start_mtoa_sequences(self.signing_sessions[session_id])
+        self.delegate.flush(self.participant_id)
+
+    def sign(self, message: Optional[int] = None, session_id: Optional[int] = None):
+        """
+            Without a message, runs the MtoA sequences for the session set up by 
+            prepare_for_signing. With a message, completes a signature from a presignature 
+            (the oldest one, unless session_id is given).
+        """
+        if message is not None:
+            self._sign_with_presignature(message, session_id)
+        else:
+            self._start_mtoa_sequences(self.signing_sessions[DEFAULT_SESSION_ID if session_id is None else session_id])
+
+        self.delegate.flush(self.participant_id)
+
+    def _sign_with_presignature(self, message: int, session_id: Optional[int]):
+        assert self.presignatures, "No presignatures available"
+
+        if session_id is None:
+            _, presignature = self.presignatures.popitem(last=False)
+        else:
+            presignature = self.presignatures.pop(session_id)
+
+        logger.debug(f'Partipant {self.participant_id}: signing with presignature {presignature.session_id}')
+
+        signing_state = self._new_signing_state(message, presignature.signer_ids, presignature.session_id)
+        signing_state.k = presignature.k
+        signing_state.sigma_i = presignature.sigma_i
+        signing_state.little_r = presignature.little_r
+        signing_state.recovery_id = presignature.recovery_id
+        signing_state.s_by_id = presignature.s_by_id
+
+        self._broadcast_signature_share(signing_state)
+
+    def _new_signing_state(self, message: Optional[int], signer_ids: Set[int], session_id: int) -> SigningState:
+        self.signing_sessions.pop(session_id, None)
+        self._expire_signing_sessions()
+
+        # make room for the new session
+        while len(self.signing_sessions) >= self.party_parameters.max_signing_sessions:
+            dropped_session_id, _ = self.signing_sessions.popitem(last=False)
+            logger.debug(f'Partipant {self.participant_id}: too many signing sessions, dropping {dropped_session_id}')
+
+        signing_state = SigningState(
             w=None,
             k=None,
             message=message,
@@ -348,106 +702,117 @@ class Participant():
             delta_i=None,
             delta_by_id={},
             little_r=None,
+            recovery_id=None,
             s_by_id={},
             mToA_outputs_as_initiator_1={},
             mToA_outputs_as_receiver_1={},
             mToA_outputs_as_initiator_2={},
-            mToA_outputs_as_receiver_2={}
+            mToA_outputs_as_receiver_2={},
+            session_id=session_id,
+            created_at=time.monotonic()
         )
+        self.signing_sessions[session_id] = signing_state
+        return signing_state
 
-        # Convert (t, n) private share x_i of x into a (t, t+1) share of x, w_i, where 
-        # sum(all(w_i)) == x (private key)
-        q = self.party_parameters.ec_n
-
-        w = self.key_gen_state.x
-        for i in signer_ids:
-            if i == self.participant_id: continue 
-            w = (w * i * compute_modular_inverse(i - self.participant_id, q)) % q
-            
-        self.signing_state.w = w
-        self.signing_state.k = gen_random_int(1, self.party_parameters.ec_n)
-        self.signing_state.gamma = gen_random_int(1, self.party_parameters.ec_n)
-        self.signing_state.gamma_elliptic = self.signing_state.gamma * self.party_parameters.ec_g
-
-    def sign(self):
-        assert self.signing_state is not None
-
-        logger.debug(f'Partipant {self.participant_id}: beginning MtoA sequences')
+    def _start_mtoa_sequences(self, signing_state: SigningState):
+        logger.debug(f'Partipant {self.participant_id}: beginning MtoA sequences for session {signing_state.session_id}')
 
-        encrypted_k = self.key_gen_state.paillier_public_key.encrypt(self.signing_state.k)
+        encrypted_k = self.compute_backend.encrypt(self.key_gen_state.paillier_public_key, signing_state.k).result()
 
         for participant_id in range(1, self.party_parameters.party_size + 1):
-            if participant_id not in self.signing_state.signer_ids or participant_id == self.participant_id:
+            if participant_id not in signing_state.signer_ids or participant_id == self.participant_id:
                 continue 
 
             # multiplication to addition share protocol 1 
             self.delegate.send(
                 self.participant_id, 
                 participant_id,
-                MtoAP2P1(encrypted_k)
+                MtoAP2P1(encrypted_k, signing_state.session_id)
             )
 
             # multiplication to addition share protocol 2 
             self.delegate.send(
                 self.participant_id, 
                 participant_id,
-                MtoAP2P2(encrypted_k)
+                MtoAP2P2(encrypted_k, signing_state.session_id)
             )
 
-    def _continue_signing_post_mtoa(self):
-        assert self.signing_state is not None
-        assert self.participant_id in self.signing_state.signer_ids
+    def _continue_signing_post_mtoa(self, signing_state: SigningState):
+        assert self.participant_id in signing_state.signer_ids
 
         logger.debug(f'Partipant {self.participant_id}: signing continuing after the MtoA sequences')
 
         # Compute little delta
-        self.signing_state.delta_i = self.signing_state.k * self.signing_state.gamma
+        signing_state.delta_i = signing_state.k * signing_state.gamma
 
-        alphas = self.signing_state.mToA_outputs_as_initiator_1.values()
-        betas = self.signing_state.mToA_outputs_as_receiver_1.values()
+        alphas = signing_state.mToA_outputs_as_initiator_1.values()
+        betas = signing_state.mToA_outputs_as_receiver_1.values()
 
         assert len(alphas) == len(betas)
-        assert len(alphas) == (len(self.signing_state.signer_ids) - 1)
+        assert len(alphas) == (len(signing_state.signer_ids) - 1)
 
-        self.signing_state.delta_i += sum(alphas) + sum(betas)
-        self.signing_state.delta_i %= self.party_parameters.ec_n
+        signing_state.delta_i += sum(alphas) + sum(betas)
+        signing_state.delta_i %= self.party_parameters.ec_n
 
         # Compute sigma 
-        self.signing_state.sigma_i = (self.signing_state.k * self.signing_state.w) % self.party_parameters.ec_n
+        signing_state.sigma_i = (signing_state.k * signing_state.w) % self.party_parameters.ec_n
 
-        mus = self.signing_state.mToA_outputs_as_initiator_2.values()
-        nus = self.signing_state.mToA_outputs_as_receiver_2.values()
+        mus = signing_state.mToA_outputs_as_initiator_2.values()
+        nus = signing_state.mToA_outputs_as_receiver_2.values()
 
         assert len(mus) == len(nus) 
-        assert len(mus) == (len(self.signing_state.signer_ids) - 1)
+        assert len(mus) == (len(signing_state.signer_ids) - 1)
 
-        self.signing_state.sigma_i += sum(mus) + sum(nus)
-        self.signing_state.sigma_i %= self.party_parameters.ec_n
+        signing_state.sigma_i += sum(mus) + sum(nus)
+        signing_state.sigma_i %= self.party_parameters.ec_n
 
         self.delegate.broadcast(
             self.participant_id,
             SigningPostMtoABroadcast(
-                delta_i=self.signing_state.delta_i, 
-                gamma_elliptic=self.signing_state.gamma_elliptic
+                delta_i=signing_state.delta_i, 
+                gamma_elliptic=signing_state.gamma_elliptic,
+                session_id=signing_state.session_id
             )
         )
 
-    def _produce_signature(self):
-        assert self.signing_state is not None
-        assert self.participant_id in self.signing_state.signer_ids
+    def _produce_signature(self, signing_state: SigningState):
+        assert self.participant_id in signing_state.signer_ids
 
         logger.debug(f'Partipant {self.participant_id}: completing signature round')
 
-        assert self.signing_state.delta 
-        assert self.signing_state.gamma_elliptic_summation is not None 
+        assert signing_state.delta 
+        assert signing_state.gamma_elliptic_summation is not None 
+
+        delta_inv = compute_modular_inverse(signing_state.delta, self.party_parameters.ec_n)
+        big_r: Point = self.compute_backend.scalar_multiply(delta_inv, signing_state.gamma_elliptic_summation).result()
+        signing_state.little_r = big_r.x.value
+        signing_state.recovery_id = big_r.y.value & 1
+
+        if signing_state.message is None:
+            self._store_presignature(signing_state)
+            return
+
+        self._broadcast_signature_share(signing_state)
+
+    def _store_presignature(self, signing_state: SigningState):
+        presignature = Presignature(
+            session_id=signing_state.session_id,
+            signer_ids=signing_state.signer_ids,
+            k=signing_state.k,
+            sigma_i=signing_state.sigma_i,
+            little_r=signing_state.little_r,
+            recovery_id=signing_state.recovery_id,
+            s_by_id={}
+        )
+        self.presignatures[presignature.session_id] = presignature
+        del self.signing_sessions[signing_state.session_id]
 
-        delta_inv = compute_modular_inverse(self.signing_state.delta, self.party_parameters.ec_n)
-        big_r: Point = delta_inv * self.signing_state.gamma_elliptic_summation
-        self.signing_state.little_r = big_r.x.value
+        logger.debug(f'Partipant {self.participant_id}: stored presignature {presignature.session_id}')
 
-        s = (self.signing_state.message * self.signing_state.k + self.signing_state.little_r * self.signing_state.sigma_i) % self.party_parameters.ec_n
-        self.signing_state.s_by_id[self.participant_id] = s 
+    def _broadcast_signature_share(self, signing_state: SigningState):
+        s = (signing_state.message * signing_state.k + signing_state.little_r * signing_state.sigma_i) % self.party_parameters.ec_n
+        signing_state.s_by_id[self.participant_id] = s 
         self.delegate.broadcast(
             self.participant_id,
-            SigningShare(s)
-        )
\ No newline at end of file
+            SigningShare(s, signing_state.session_id)
+        )
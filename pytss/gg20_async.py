@@ -0,0 +1,202 @@
+from typing import Callable, List, Optional, Set, Tuple
+from collections import OrderedDict
+from concurrent.futures import Executor
+import abc
+import asyncio
+import logging
+from .elliptic_curve import (
+    Signature
+)
+from .compute import (
+    ComputeBackend
+)
+from .paillier import (
+    PaillierPublicKey,
+    PaillierPrivateKey
+)
+from .gg20 import (
+    BaseMessage,
+    CommunicationDelegate,
+    DEFAULT_SESSION_ID,
+    Envelope,
+    Parameters,
+    Participant
+)
+
+logger = logging.getLogger(__name__)
+
+# asyncio counterpart of gg20.CommunicationDelegate
+class AsyncCommunicationDelegate(metaclass=abc.ABCMeta):
+
+    @abc.abstractmethod
+    async def broadcast(self, sender_id: int, message: BaseMessage):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        raise NotImplementedError
+
+# Collects what a Participant sends while handling one step, for the driver to send 
+# asynchronously once the step is done
+class _OutboxDelegate(CommunicationDelegate):
+
+    def __init__(self):
+        self.outbox: List[Tuple[int, Optional[int], BaseMessage]] = []
+
+    def broadcast(self, sender_id: int, message: BaseMessage):
+        self.outbox.append((sender_id, None, message))
+
+    def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        self.outbox.append((sender_id, recipient_id, message))
+
+    def drain(self) -> List[Tuple[int, Optional[int], BaseMessage]]:
+        outbox, self.outbox = self.outbox, []
+        return outbox
+
+class AsyncParticipantDriver:
+    """
+        Runs a gg20.Participant on an asyncio event loop. 
+
+        Incoming messages are queued by deliver() and handled one at a time, in an executor, 
+        so the CPU heavy Paillier / EC work doesn't block the loop. Whatever the participant 
+        sends while handling a message is handed to the AsyncCommunicationDelegate as separate 
+        tasks, so I/O to different peers -- and for different sessions -- overlaps. Messages 
+        for rounds or sessions we haven't reached yet are buffered by the Participant itself.
+    """
+
+    def __init__(
+        self,
+        participant_id: int,
+        delegate: AsyncCommunicationDelegate,
+        party_parameters: Parameters,
+        executor: Optional[Executor] = None,
+        compute_backend: Optional[ComputeBackend] = None
+    ):
+        self.delegate = delegate
+        self.executor = executor
+
+        self._outbox_delegate = _OutboxDelegate()
+        self.participant = Participant(
+            participant_id=participant_id,
+            delegate=self._outbox_delegate,
+            party_parameters=party_parameters,
+            compute_backend=compute_backend
+        )
+
+        self._inbox: Optional[asyncio.Queue] = None
+        self._step_lock: Optional[asyncio.Lock] = None
+        self._progress: Optional[asyncio.Condition] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._sends = set()
+        # Failures handling incoming messages, by the signing session they belong to (None 
+        # for key generation), until someone waiting on that session raises them
+        self._errors: "OrderedDict[Optional[int], BaseException]" = OrderedDict()
+
+    @property
+    def participant_id(self) -> int:
+        return self.participant.participant_id
+
+    def start(self):
+        # Must be called from within the running event loop
+        if self._worker is not None:
+            return
+
+        self._inbox = asyncio.Queue()
+        self._step_lock = asyncio.Lock()
+        self._progress = asyncio.Condition()
+        self._worker = asyncio.ensure_future(self._handle_messages())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        await asyncio.gather(*self._sends, return_exceptions=True)
+
+    async def deliver(self, sender_id: int, message: BaseMessage):
+        self.start()
+        await self._inbox.put((sender_id, message))
+
+    async def key_gen(
+        self, 
+        paillier_key_source: Optional[Callable[[], Tuple[PaillierPublicKey, PaillierPrivateKey]]] = None
+    ):
+        self.start()
+        await self._step(self.participant.key_gen, paillier_key_source)
+
+        party_size = self.participant.party_parameters.party_size
+        key_gen_state = self.participant.key_gen_state
+        await self._wait_for(lambda: key_gen_state.x is not None and len(key_gen_state.other_y_by_id) == party_size, None)
+
+    async def sign(self, message: int, signer_ids: Set[int], session_id: int = DEFAULT_SESSION_ID) -> Signature:
+        self.start()
+        await self._step(self.participant.prepare_for_signing, message, signer_ids, session_id)
+        await self._step(self.participant.sign, None, session_id)
+
+        await self._wait_for(lambda: self._has_all_shares(session_id), session_id)
+        return self.participant.signature(session_id)
+
+    async def presign(self, signer_ids: Set[int], session_id: int):
+        self.start()
+        await self._step(self.participant.presign, signer_ids, session_id)
+        await self._wait_for(lambda: session_id in self.participant.presignatures, session_id)
+
+    async def sign_with_presignature(self, message: int, session_id: int) -> Signature:
+        self.start()
+        await self._step(self.participant.sign, message, session_id)
+
+        await self._wait_for(lambda: self._has_all_shares(session_id), session_id)
+        return self.participant.signature(session_id)
+
+    def _has_all_shares(self, session_id: int) -> bool:
+        signing_state = self.participant.signing_sessions.get(session_id)
+        return (
+            signing_state is not None and 
+            signing_state.message is not None and 
+            len(signing_state.s_by_id) == len(signing_state.signer_ids)
+        )
+
+    async def _handle_messages(self):
+        while True:
+            sender_id, message = await self._inbox.get()
+            try:
+                await self._step(self.participant.receive_message, sender_id, message)
+            except Exception as e:
+                logger.exception(f'Partipant {self.participant_id}: failed handling {type(message).__name__} from {sender_id}')
+                for each in (message.messages if isinstance(message, Envelope) else [message]):
+                    self._errors[getattr(each, "session_id", None)] = e
+                while len(self._errors) > self.participant.party_parameters.max_signing_sessions:
+                    self._errors.popitem(last=False)
+                async with self._progress:
+                    self._progress.notify_all()
+
+    async def _step(self, fn: Callable, *args):
+        # Participant state is not thread safe, so steps run one at a time
+        async with self._step_lock:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self.executor, fn, *args)
+            finally:
+                outbox = self._outbox_delegate.drain()
+
+        for sender_id, recipient_id, message in outbox:
+            if recipient_id is None:
+                send = self.delegate.broadcast(sender_id, message)
+            else:
+                send = self.delegate.send(sender_id, recipient_id, message)
+
+            task = asyncio.ensure_future(send)
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+        async with self._progress:
+            self._progress.notify_all()
+
+    async def _wait_for(self, predicate: Callable[[], bool], session_id: Optional[int]):
+        # Waits on one signing session, or key generation for None, failing only on its own errors
+        async with self._progress:
+            while not predicate():
+                if session_id in self._errors:
+                    raise self._errors.pop(session_id)
+                await self._progress.wait()
@@ -1,39 +1,113 @@
 import base64
-from typing import Tuple
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Tuple
 from .common_crypto import (
     prime_of_n_bits,
-    gen_random_int
+    parallel_primes_of_n_bits,
+    gen_random_int,
+    derive_sealing_key,
+    seal,
+    unseal,
+    SEALING_SALT_BYTES
 )
 from .utils import (
-    chunks,
-    Converters
+    read_chunks
 )
 
+if TYPE_CHECKING:
+    from .compute import ComputeBackend
+
 DEFAULT_BITS = 3072
+DEFAULT_RANDOMNESS_POOL_DEPTH = 64
+DEFAULT_KEY_POOL_HIGH_WATER_MARK = 4
+
+# Chunks encrypted or decrypted at once by the stream functions, given a compute backend
+DEFAULT_STREAM_WINDOW = 16
+
+def _plaintext_chunk_bytes(size: int) -> int:
+    # Leaves room for the 0x01 frame marker, so a framed chunk is always less than n
+    return size // 8 - 1
+
+def _ciphertext_chunk_bytes(size: int) -> int:
+    return 2 * ((size + 7) // 8)
+
+def _in_order(
+    values: Iterable[int], 
+    fn: Callable[[int], int], 
+    submit: Optional[Callable[[int], Future]], 
+    window: int
+) -> Iterator[int]:
+    # fn of each value, in order; through submit with up to window values in flight when given
+    if submit is None:
+        for value in values:
+            yield fn(value)
+        return
+
+    pending = deque()
+    for value in values:
+        pending.append(submit(value))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 class PaillierPublicKey:
 
-    def __init__(self, n: int, r: int, size: int):
+    def __init__(self, n: int, size: int):
         self.n = n 
         self.g = n + 1
-        self.r = r
         self.n_squared = n * n
         self.size = size
+        self.randomness_pool: Optional["PaillierRandomnessPool"] = None
+
+    def __getstate__(self):
+        # The randomness pool (and its thread) stays with the original key
+        state = self.__dict__.copy()
+        state["randomness_pool"] = None
+        return state
 
     def encrypt(self, pt: int) -> int:
         assert pt.bit_length() <= self.size, "Plaintext too large"
-        return (pow(self.g, pt, self.n_squared) * pow(self.r, self.n, self.n_squared)) % self.n_squared
+        # with g = n + 1, g^pt == 1 + pt * n (mod n^2)
+        r_n = self.randomness_pool.take() if self.randomness_pool is not None else self.random_mask()
+        return ((1 + pt * self.n) * r_n) % self.n_squared
+
+    def random_mask(self) -> int:
+        # fresh r^n mod n^2
+        return pow(gen_random_int(1, self.n), self.n, self.n_squared)
 
     def encrypt_bytes(self, pt: bytes) -> bytes:
-        bytes_per_chunk = self.size // 8 
-        enc_bytes = [ 
-            Converters.int_to_bytes(
-                self.encrypt(Converters.bytes_to_int(chunk)),
-                bytes_per_chunk * 2
-            ) for chunk in chunks(pt, bytes_per_chunk) 
-        ]
+        return b"".join(self.encrypt_stream(pt))
+
+    def encrypt_stream(
+        self, 
+        source, 
+        compute_backend: Optional["ComputeBackend"] = None, 
+        window: int = DEFAULT_STREAM_WINDOW
+    ) -> Iterator[bytes]:
+        """
+            Encrypts source, a bytes-like object or binary file, a chunk at a time, yielding 
+            each chunk's ciphertext. Chunks of up to size // 8 - 1 bytes are framed as 
+            0x01 || chunk before encryption, so decrypt_stream gets back exactly the bytes 
+            that went in, leading and trailing zeros included.
+
+            With a compute backend, up to window chunks are encrypted at once.
+        """
+        ciphertext_bytes = _ciphertext_chunk_bytes(self.size)
+        framed = ( 
+            (1 << (8 * len(chunk))) | int.from_bytes(chunk, 'big') 
+            for chunk in read_chunks(source, _plaintext_chunk_bytes(self.size)) 
+        )
+        submit = (lambda pt: compute_backend.encrypt(self, pt)) if compute_backend is not None else None
 
-        return b"".join(enc_bytes)
+        for ct in _in_order(framed, self.encrypt, submit, window):
+            yield ct.to_bytes(ciphertext_bytes, 'big')
 
     def encrypt_string(self, pt: str) -> str:
         enc_bytes = self.encrypt_bytes(pt.encode())
@@ -43,7 +117,10 @@ class PaillierPublicKey:
         return pow(ct, pt, self.n_squared)
 
     def homomorphic_add(self, ct: int, pt: int) -> int:
-        return (ct * self.encrypt(pt)) % self.n_squared
+        return self.homomorphic_add_encrypted(ct, self.encrypt(pt))
+
+    def homomorphic_add_encrypted(self, ct_a: int, ct_b: int) -> int:
+        return (ct_a * ct_b) % self.n_squared
         
 class PaillierPrivateKey:
 
@@ -57,17 +134,55 @@ class PaillierPrivateKey:
         self.mu = pow(self.lam, -1, self.n)
         self.size = size
 
+        # CRT decryption constants: decrypt mod p^2 and q^2 separately, then recombine
+        self.p_squared = p * p
+        self.q_squared = q * q
+        self.hp = pow((pow(self.g, p - 1, self.p_squared) - 1) // p, -1, p)
+        self.hq = pow((pow(self.g, q - 1, self.q_squared) - 1) // q, -1, q)
+        self.p_inv_mod_q = pow(p, -1, q)
+        self.p_squared_inv_mod_q_squared = pow(self.p_squared, -1, self.q_squared)
+
     def decrypt(self, ct: int) -> int:
-        return ((self._l_function(pow(ct, self.lam, self.n_squared))) * self.mu) % self.n
+        mp = (((pow(ct, self.p - 1, self.p_squared) - 1) // self.p) * self.hp) % self.p
+        mq = (((pow(ct, self.q - 1, self.q_squared) - 1) // self.q) * self.hq) % self.q
+        return mp + (((mq - mp) * self.p_inv_mod_q) % self.q) * self.p
+
+    def random_mask(self) -> int:
+        # r^n mod n^2, computed mod p^2 and q^2 with exponents reduced by phi(p^2) and phi(q^2)
+        r = gen_random_int(1, self.n)
+        mask_p = pow(r, self.n % (self.p * (self.p - 1)), self.p_squared)
+        mask_q = pow(r, self.n % (self.q * (self.q - 1)), self.q_squared)
+        return mask_p + (((mask_q - mask_p) * self.p_squared_inv_mod_q_squared) % self.q_squared) * self.p_squared
 
     def decrypt_bytes(self, ct: bytes) -> bytes:
-        decrypted_bytes = [ 
-            Converters.int_to_bytes(
-                self.decrypt(Converters.bytes_to_int(each)),
-                self.size // 8
-            ).strip(b'\x00') for each in chunks(ct, self.size // 4) 
-        ]
-        return b"".join(decrypted_bytes) 
+        return b"".join(self.decrypt_stream(ct))
+
+    def decrypt_stream(
+        self, 
+        source, 
+        compute_backend: Optional["ComputeBackend"] = None, 
+        window: int = DEFAULT_STREAM_WINDOW
+    ) -> Iterator[bytes]:
+        """
+            Decrypts the output of encrypt_stream, read from a bytes-like object or binary 
+            file, yielding the plaintext a chunk at a time. With a compute backend, up to 
+            window chunks are decrypted at once.
+        """
+        ciphertext_bytes = _ciphertext_chunk_bytes(self.size)
+        max_chunk_bytes = _plaintext_chunk_bytes(self.size)
+        submit = (lambda ct: compute_backend.decrypt(self, ct)) if compute_backend is not None else None
+
+        for framed in _in_order(self._ciphertext_chunks(source, ciphertext_bytes), self.decrypt, submit, window):
+            length = max(framed.bit_length() - 1, 0) // 8
+            if length > max_chunk_bytes or framed >> (8 * length) != 1:
+                raise ValueError("Ciphertext chunk does not decrypt to a framed plaintext")
+            yield (framed ^ (1 << (8 * length))).to_bytes(length, 'big')
+
+    def _ciphertext_chunks(self, source, ciphertext_bytes: int) -> Iterator[int]:
+        for chunk in read_chunks(source, ciphertext_bytes):
+            if len(chunk) != ciphertext_bytes:
+                raise ValueError("Truncated ciphertext")
+            yield int.from_bytes(chunk, 'big')
 
     def decrypt_b64(self, ct: str) -> str:
         enc_bytes = base64.b64decode(ct)
@@ -77,20 +192,201 @@ class PaillierPrivateKey:
     def _l_function(self, x):
         return (x - 1) // self.n
 
-def generate_key_pair(size=DEFAULT_BITS) -> Tuple[PaillierPublicKey, PaillierPrivateKey]:
-    p = q = n = None
-    n_len = 0
+class PaillierRandomnessPool:
+    """
+        Pool of precomputed r^n mod n^2 encryption masks, topped up to `depth` by a background 
+        thread, so that each encryption gets fresh randomness for a single modular multiplication.
+        `key` is anything with a random_mask() method; pass the private key when we own it, so 
+        the masks are computed with CRT. If the pool runs dry, masks are computed inline.
+
+        Note that pow() holds the GIL, so refilling only overlaps with time spent waiting on I/O.
+    """
+
+    def __init__(self, key, depth: int = DEFAULT_RANDOMNESS_POOL_DEPTH):
+        self.key = key
+        self.depth = depth
+        self._masks = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._refill, daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def take(self) -> int:
+        with self._condition:
+            mask = self._masks.popleft() if self._masks else None
+            self._condition.notify()
+
+        return mask if mask is not None else self.key.random_mask()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _refill(self):
+        while True:
+            with self._condition:
+                while not self._closed and len(self._masks) >= self.depth:
+                    self._condition.wait()
+                if self._closed:
+                    return
+
+            mask = self.key.random_mask()
+            with self._condition:
+                self._masks.append(mask)
+
+def generate_key_pair(
+    size=DEFAULT_BITS, 
+    workers: int = 1, 
+    progress: Optional[Callable[[str, float], None]] = None
+) -> Tuple[PaillierPublicKey, PaillierPrivateKey]:
+    """
+        With workers > 1, p and q are searched for in parallel across that many processes.
+        progress, if given, is called with ("p", seconds elapsed), then ("q", ...) as the 
+        primes are found, and finally ("done", ...).
+    """
+    start = time.perf_counter()
 
-    while n_len != size:
-        p = q = prime_of_n_bits(size // 2)
+    def _report(stage: str):
+        if progress is not None:
+            progress(stage, time.perf_counter() - start)
+
+    # Both primes have their top 2 bits set, so n always has exactly `size` bits
+    p_bits = size // 2
+    q_bits = size - p_bits
+
+    if workers > 1 and p_bits == q_bits:
+        stages = iter(["p", "q"])
+        p, q = parallel_primes_of_n_bits(p_bits, 2, workers, top_bits=2, on_prime=lambda _: _report(next(stages)))
+    else:
+        p = prime_of_n_bits(p_bits, top_bits=2)
+        _report("p")
+        q = p
         while q == p:
-            q = prime_of_n_bits(size // 2)
+            q = prime_of_n_bits(q_bits, top_bits=2)
+        _report("q")
 
-        n = p * q
-        n_len = n.bit_length()
+    n = p * q
+    assert n.bit_length() == size
 
-    r = gen_random_int(0, n)
-    public_key = PaillierPublicKey(n, r, size)
+    public_key = PaillierPublicKey(n, size)
     private_key = PaillierPrivateKey(p, q, size)
+    _report("done")
+
+    return public_key, private_key
+
+class PaillierKeyPool:
+    """
+        Pre-generated Paillier key pairs of one size, topped up to `high_water_mark` by a 
+        background thread. take() hands out a pair in O(1), and generates one inline if 
+        the pool is empty; pass pool.take as a Participant's Paillier key source.
+
+        With a `path`, every pair is also kept in that directory, sealed under a key derived 
+        from `passphrase`, so a restarted pool picks up where it left off. A pair's file is 
+        removed when it's handed out. A directory must only be used by one pool at a time.
+
+        `key_factory(size)` makes a pair, generate_key_pair by default. Prime search holds 
+        the GIL, so e.g. functools.partial(generate_key_pair, workers=4) keeps the refill 
+        off this process's cores.
+    """
+
+    SALT_FILE = "salt"
+    KEY_FILE_SUFFIX = ".paillier"
+
+    def __init__(
+        self, 
+        size: int = DEFAULT_BITS, 
+        high_water_mark: int = DEFAULT_KEY_POOL_HIGH_WATER_MARK, 
+        path: Optional[str] = None, 
+        passphrase: Optional[bytes] = None,
+        key_factory: Optional[Callable[[int], Tuple[PaillierPublicKey, PaillierPrivateKey]]] = None
+    ):
+        assert path is None or passphrase, "A persisted key pool needs a passphrase"
+
+        self.size = size
+        self.high_water_mark = high_water_mark
+        self.path = path
+        self.key_factory = key_factory if key_factory is not None else generate_key_pair
+        # (file name or None, public key, private key)
+        self._pairs = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._sealing_key = self._load(passphrase) if path is not None else None
+        self._thread = threading.Thread(target=self._refill, daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def take(self) -> Tuple[PaillierPublicKey, PaillierPrivateKey]:
+        with self._condition:
+            entry = self._pairs.popleft() if self._pairs else None
+            self._condition.notify()
+
+        if entry is None:
+            return self.key_factory(self.size)
+
+        file_name, public_key, private_key = entry
+        if file_name is not None:
+            os.remove(file_name)
+
+        return public_key, private_key
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _refill(self):
+        while True:
+            with self._condition:
+                while not self._closed and len(self._pairs) >= self.high_water_mark:
+                    self._condition.wait()
+                if self._closed:
+                    return
+
+            public_key, private_key = self.key_factory(self.size)
+            file_name = self._store(private_key) if self.path is not None else None
+            with self._condition:
+                self._pairs.append((file_name, public_key, private_key))
+
+    def _load(self, passphrase: bytes) -> bytes:
+        os.makedirs(self.path, exist_ok=True)
+
+        salt_file = os.path.join(self.path, self.SALT_FILE)
+        if not os.path.exists(salt_file):
+            self._write_file(salt_file, secrets.token_bytes(SEALING_SALT_BYTES))
+        with open(salt_file, "rb") as f:
+            sealing_key = derive_sealing_key(passphrase, f.read())
+
+        for each in sorted(os.listdir(self.path)):
+            if not each.endswith(self.KEY_FILE_SUFFIX):
+                continue
+
+            file_name = os.path.join(self.path, each)
+            with open(file_name, "rb") as f:
+                stored = json.loads(unseal(sealing_key, f.read()))
+            # pairs of other sizes are left for a pool of that size
+            if stored["size"] != self.size:
+                continue
+
+            private_key = PaillierPrivateKey(stored["p"], stored["q"], stored["size"])
+            self._pairs.append((file_name, PaillierPublicKey(private_key.n, private_key.size), private_key))
+
+        return sealing_key
+
+    def _store(self, private_key: PaillierPrivateKey) -> str:
+        stored = { "size": private_key.size, "p": private_key.p, "q": private_key.q }
+        file_name = os.path.join(self.path, secrets.token_hex(16) + self.KEY_FILE_SUFFIX)
+        self._write_file(file_name, seal(self._sealing_key, json.dumps(stored).encode()))
+        return file_name
 
-    return public_key, private_key
\ No newline at end of file
+    def _write_file(self, file_name: str, data: bytes):
+        # owner-only, and atomically in place so a crash never leaves a partial file
+        temp_file_name = file_name + ".tmp"
+        with os.fdopen(os.open(temp_file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(data)
+        os.replace(temp_file_name, file_name)
@@ -1,21 +1,53 @@
-from typing import List, Tuple
+from typing import FrozenSet, Iterable, List, Mapping, Sequence, Tuple
+from collections import OrderedDict
+import threading
 from fractions import Fraction
 from math import prod as list_product
 from .common_crypto import (
     gen_random_int
 )
 from .common_math import (
-    compute_modular_inverse
+    batch_modular_inverse
 )
+from .elliptic_curve import (
+    Point,
+    RANDOMIZER_BITS,
+    multi_scalar_mul
+)
+
+# Number of (signer set, participant, order) entries kept by a LagrangeCache
+DEFAULT_LAGRANGE_CACHE_SIZE = 4096
+
+# Batched evaluation lets the accumulators grow by up to this many bits between reductions
+LAZY_REDUCTION_BITS = 256
 
 def _evaluate_polynomial(coefficients: List[int], x: int, modulus: int) -> int:
-    acc = coefficients[0]
+    # Horner's rule, highest degree coefficient first
+    acc = 0
 
-    for i in range(1, len(coefficients)):
-        acc = (acc + coefficients[i] * pow(x, i, modulus)) % modulus
+    for coefficient in reversed(coefficients):
+        acc = (acc * x + coefficient) % modulus
 
     return acc
 
+def evaluate_polynomial(coefficients: List[int], xs: Sequence[int], modulus: int) -> List[int]:
+    """
+        Evaluates the polynomial with the given coefficients (lowest degree first) at every x, 
+        with Horner's rule run across all the points at once. Each step grows the accumulators 
+        by at most the bit length of the largest x, so for small x, e.g. share indices, 
+        reducing only every few steps saves most of the modular reductions.
+    """
+    x_bits = max((abs(x).bit_length() for x in xs), default=1)
+    reduction_interval = max(1, LAZY_REDUCTION_BITS // max(x_bits, 1))
+
+    accs = [0] * len(xs)
+    for i, coefficient in enumerate(reversed(coefficients), start=1):
+        accs = [ acc * x + coefficient for acc, x in zip(accs, xs) ]
+        if i % reduction_interval == 0:
+            accs = [ acc % modulus for acc in accs ]
+
+    return [ acc % modulus for acc in accs ]
+
 def split_into_shares(secret: int, n: int, t: int, finite_field_order: int) -> Tuple[int, int]:
     """
         Shamir secret sharing -- masks a secret across n shares requiring a t threshold to unmask.
@@ -28,19 +60,171 @@ def split_into_shares(secret: int, n: int, t: int, finite_field_order: int) -> T
     # generate coefficients of polynomial w/ degree threshold - 1
     # first coefficient (0th power coefficient) is our secret to be masked
     coefficients = [secret] + [ gen_random_int(1, finite_field_order) for _ in range(t - 1) ] 
+    return _shares(coefficients, n, finite_field_order)
+
+def _shares(coefficients: List[int], n: int, finite_field_order: int) -> List[Tuple[int, int]]:
+    xs = range(1, n + 1)
+    return list(zip(xs, evaluate_polynomial(coefficients, xs, finite_field_order)))
+
+def split_into_verifiable_shares(
+    secret: int, n: int, t: int, generator: Point, finite_field_order: int
+) -> Tuple[List[Tuple[int, int]], List[Point]]:
+    """
+        Feldman VSS -- Shamir shares of secret, along with commitments C_k = a_k * G to each 
+        of the polynomial's coefficients. C_0 = secret * G, and anyone holding the commitments 
+        can check a share (x, y) against them with verify_share.
+    """
+    assert(n >= t)
+
+    coefficients = [secret] + [ gen_random_int(1, finite_field_order) for _ in range(t - 1) ]
+    commitments = [ coefficient * generator for coefficient in coefficients ]
+    return _shares(coefficients, n, finite_field_order), commitments
+
+def _share_check_terms(
+    x: int, y: int, commitments: Sequence[Point], generator: Point, finite_field_order: int, weight: int = 1
+) -> List[Tuple[int, Point]]:
+    # weight * (sum(x^k * C_k) - y * G), as multi_scalar_mul terms
+    terms = [(-weight * y % finite_field_order, generator)]
+    power = weight
+    for commitment in commitments:
+        terms.append((power, commitment))
+        power = (power * x) % finite_field_order
+
+    return terms
+
+def verify_share(x: int, y: int, commitments: Sequence[Point], generator: Point, finite_field_order: int) -> bool:
+    """
+        Checks y == f(x) for the polynomial behind the Feldman commitments, i.e. 
+        y * G == sum(x^k * C_k), as a single multi-scalar multiplication.
+    """
+    return multi_scalar_mul(_share_check_terms(x, y, commitments, generator, finite_field_order)).x is None
+
+def verify_shares(
+    x: int, 
+    shares_and_commitments: Mapping[int, Tuple[int, Sequence[Point]]], 
+    generator: Point, 
+    finite_field_order: int
+) -> List[int]:
+    """
+        Checks the shares at x received from many dealers, given as dealer -> (share, 
+        commitments), with one randomized linear combination of every dealer's check:
+
+            sum(r_j * (sum(x^k * C_jk) - y_j * G)) == infinity
+
+        so G is multiplied once overall. If that fails, each share is checked on its own. 
+        Returns the dealers whose shares did not verify, in order.
+    """
+    terms = []
+    generator_scalar = 0
+    for i, (y, commitments) in enumerate(shares_and_commitments.values()):
+        weight = 1 if i == 0 else gen_random_int(1, 2 ** RANDOMIZER_BITS)
+        dealer_terms = _share_check_terms(x, y, commitments, generator, finite_field_order, weight)
+        generator_scalar += dealer_terms[0][0]
+        terms.extend(dealer_terms[1:])
+
+    terms.append((generator_scalar % finite_field_order, generator))
+    if multi_scalar_mul(terms).x is None:
+        return []
+
+    return sorted(
+        dealer for dealer, (y, commitments) in shares_and_commitments.items()
+        if not verify_share(x, y, commitments, generator, finite_field_order)
+    )
+
+def recover_secret(shares: Tuple[int, int], finite_field_order: int) -> int:
+    xs = [ x for x, _ in shares ]
+    coefficients = lagrange_cache.coefficients(xs, finite_field_order)
+
+    return sum(coefficient * y for coefficient, (_, y) in zip(coefficients, shares)) % finite_field_order
+
+def lagrange_coefficients(xs: Sequence[int], finite_field_order: int) -> List[int]:
+    """
+        Lagrange basis polynomials for the points xs, evaluated at 0: 
+        l_i = prod(x_j / (x_j - x_i)) over j != i. Takes O(k^2) multiplications and a single 
+        modular inversion for k points.
+    """
+    assert len(set(xs)) == len(xs), "Points must be distinct"
+
+    # the numerators are products of all the other points, from prefix and suffix products
+    prefix = [1]
+    for x in xs:
+        prefix.append((prefix[-1] * x) % finite_field_order)
+    suffix = [1]
+    for x in reversed(xs):
+        suffix.append((suffix[-1] * x) % finite_field_order)
+    suffix.reverse()
+
+    denominators = []
+    for i, x_i in enumerate(xs):
+        denominator = 1
+        for j, x_j in enumerate(xs):
+            if i != j:
+                denominator = (denominator * (x_j - x_i)) % finite_field_order
+        denominators.append(denominator)
+
     return [
-        (i, _evaluate_polynomial(coefficients, i, finite_field_order)) for i in range(1, n + 1)
+        (prefix[i] * suffix[i + 1] * inverse) % finite_field_order
+        for i, inverse in enumerate(batch_modular_inverse(denominators, finite_field_order))
     ]
 
-def recover_secret(shares: Tuple[int, int], finite_field_order: int) -> int:
-    secret = 0
-    for i in range(len(shares)):
-        l = shares[i][1]
-        for j in range(len(shares)):
-            if i == j: continue
+class LagrangeCache:
+    """
+        LRU cache of Lagrange coefficients, keyed by (frozenset(xs), x, field order). Signer 
+        sets repeat a lot, and a miss computes the coefficients for the whole set at once.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_LAGRANGE_CACHE_SIZE):
+        self.max_size = max_size
+        self._coefficients: "OrderedDict[Tuple[FrozenSet[int], int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._coefficients)
+
+    def coefficient(self, xs: Iterable[int], x: int, finite_field_order: int) -> int:
+        # x's coefficient within the set xs
+        xs = frozenset(xs)
+        key = (xs, x, finite_field_order)
+        with self._lock:
+            if key in self._coefficients:
+                self._coefficients.move_to_end(key)
+                return self._coefficients[key]
+
+        coefficients = self._compute(xs, finite_field_order)
+        return coefficients[x]
+
+    def coefficients(self, xs: Sequence[int], finite_field_order: int) -> List[int]:
+        # The coefficients of every x, in order
+        xs_set = frozenset(xs)
+        with self._lock:
+            cached = []
+            for x in xs:
+                key = (xs_set, x, finite_field_order)
+                if key not in self._coefficients:
+                    break
+                self._coefficients.move_to_end(key)
+                cached.append(self._coefficients[key])
+            else:
+                return cached
+
+        coefficients = self._compute(xs_set, finite_field_order)
+        return [ coefficients[x] for x in xs ]
+
+    def clear(self):
+        with self._lock:
+            self._coefficients.clear()
+
+    def _compute(self, xs: FrozenSet[int], finite_field_order: int) -> Mapping[int, int]:
+        ordered_xs = sorted(xs)
+        coefficients = dict(zip(ordered_xs, lagrange_coefficients(ordered_xs, finite_field_order)))
+
+        with self._lock:
+            for x, coefficient in coefficients.items():
+                self._coefficients[(xs, x, finite_field_order)] = coefficient
+            while len(self._coefficients) > self.max_size:
+                self._coefficients.popitem(last=False)
 
-            l = (l * (shares[j][0] * compute_modular_inverse(shares[j][0] - shares[i][0], finite_field_order))) % finite_field_order
+        return coefficients
 
-        secret = (secret + l) % finite_field_order
-    
-    return secret
+# Shared by recover_secret and the gg20 participants
+lagrange_cache = LagrangeCache()
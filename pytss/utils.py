@@ -4,6 +4,28 @@ def chunks(lst, n):
     for i in range(0, len(lst), n):
         yield lst[i:i + n]
 
+def read_chunks(source, n):
+    # n byte chunks of a bytes-like object or binary file, the last one possibly shorter. 
+    # Bytes-like sources are sliced through a memoryview instead of copied, and files are 
+    # read into one reused buffer, so each chunk is only valid until the next is yielded.
+    if hasattr(source, "readinto"):
+        view = memoryview(bytearray(n))
+        while True:
+            filled = 0
+            while filled < n:
+                read = source.readinto(view[filled:])
+                if not read:
+                    break
+                filled += read
+            if filled:
+                yield view[:filled]
+            if filled < n:
+                return
+    else:
+        view = memoryview(source).cast("B")
+        for i in range(0, len(view), n):
+            yield view[i:i + n]
+
 class Converters:
     def string_to_int(message: str) -> int:
         return int(binascii.hexlify(message.encode("utf-8")), 16)
@@ -0,0 +1,308 @@
+from typing import Callable, List, Mapping, Tuple, Type
+import struct
+from .elliptic_curve import (
+    Point
+)
+from .paillier import (
+    PaillierPublicKey
+)
+from .errors import (
+    ErrorDecodingMessage
+)
+from .gg20 import (
+    BaseMessage,
+    Envelope,
+    KeyGenBroadcast,
+    KeyGenP2P,
+    MtoAP2P1,
+    MtoAP2P1Response,
+    MtoABroadcast1,
+    MtoAP2P2,
+    MtoAP2P2Response,
+    Parameters,
+    SigningPostMtoABroadcast,
+    SigningShare
+)
+
+# Binary wire format for the gg20 messages. Every message is one frame:
+#
+#   version (1 byte) || type tag (1 byte) || body length (4 bytes) || body
+#
+# and the body is the message's fields in declaration order, each at a fixed width set by
+# the party's Parameters: compressed SEC1 points, scalars mod the curve order, Paillier
+# ciphertexts mod n^2 and moduli n, all big-endian, 8 byte session ids, and key generation
+# commitments as threshold points back to back.
+#
+# An Envelope's body is its distinct ciphertexts, then its messages, each as a type tag and
+# body, in which ciphertexts are 2 byte indices into that table; e.g. the MtoAP2P1 and
+# MtoAP2P2 a signer sends to each peer carry the same encrypted k, which goes out once:
+#
+#   ciphertext count (2 bytes) || ciphertexts || message count (2 bytes) || (tag || body)*
+WIRE_VERSION = 1
+
+HEADER = struct.Struct(">BBI")
+SESSION_ID = struct.Struct(">Q")
+COUNT = struct.Struct(">H")
+ENVELOPE_TAG = 10
+
+MESSAGE_TAGS: Mapping[Type[BaseMessage], int] = {
+    KeyGenBroadcast: 1,
+    KeyGenP2P: 2,
+    MtoAP2P1: 3,
+    MtoAP2P1Response: 4,
+    MtoABroadcast1: 5,
+    MtoAP2P2: 6,
+    MtoAP2P2Response: 7,
+    SigningPostMtoABroadcast: 8,
+    SigningShare: 9
+}
+
+# Field name and kind, in wire order
+MESSAGE_FIELDS: Mapping[Type[BaseMessage], Tuple[Tuple[str, str], ...]] = {
+    KeyGenBroadcast: (("y", "point"), ("paillier_pk", "paillier_key"), ("commitments", "commitments")),
+    KeyGenP2P: (("shamir_share", "scalar"),),
+    MtoAP2P1: (("encrypted_value", "ciphertext"), ("session_id", "session_id")),
+    MtoAP2P1Response: (("cipher_b", "ciphertext"), ("session_id", "session_id")),
+    MtoABroadcast1: (("gamma_elliptic", "point"), ("session_id", "session_id")),
+    MtoAP2P2: (("encrypted_value", "ciphertext"), ("session_id", "session_id")),
+    MtoAP2P2Response: (("encrypted_value", "ciphertext"), ("session_id", "session_id")),
+    SigningPostMtoABroadcast: (("delta_i", "scalar"), ("gamma_elliptic", "point"), ("session_id", "session_id")),
+    SigningShare: (("share", "scalar"), ("session_id", "session_id"))
+}
+
+class WireCodec:
+    """
+        Encodes gg20 messages to frames and back. Decoding accepts any bytes-like object
+        and reads it through a memoryview, so frames can be decoded in place out of a larger
+        receive buffer; encode_into likewise writes straight into a caller's buffer.
+
+        Points are validated on decode and scalars must be reduced mod the curve order;
+        anything malformed raises ErrorDecodingMessage.
+    """
+
+    def __init__(self, parameters: Parameters):
+        self.curve = parameters.ec
+        self.order = parameters.ec_n
+        self.paillier_size = parameters.paillier_security_parameter
+
+        point_bytes = (self.curve.field.prime.bit_length() + 7) // 8 + 1
+        scalar_bytes = (self.order.bit_length() + 7) // 8
+        modulus_bytes = (self.paillier_size + 7) // 8
+        ciphertext_bytes = 2 * modulus_bytes
+
+        self._ciphertext_bytes = ciphertext_bytes
+        self._point_bytes = point_bytes
+        self.threshold = parameters.threshold
+
+        # kind -> (width, encoder, decoder), standalone and inside an envelope
+        self._kinds: Mapping[str, Tuple[int, Callable, Callable]] = {
+            "point": (point_bytes, self._encode_point, self._decode_point),
+            "scalar": (scalar_bytes, self._encode_int, self._decode_scalar),
+            "ciphertext": (ciphertext_bytes, self._encode_int, self._decode_int),
+            "paillier_key": (modulus_bytes, self._encode_paillier_key, self._decode_paillier_key),
+            "session_id": (SESSION_ID.size, self._encode_int, self._decode_int),
+            "commitments": (parameters.threshold * point_bytes, self._encode_points, self._decode_points)
+        }
+        self._enveloped_kinds = dict(self._kinds, ciphertext=(COUNT.size, None, None))
+
+        self._body_sizes = self._sizes(self._kinds)
+        self._enveloped_body_sizes = self._sizes(self._enveloped_kinds)
+        self._types_by_tag: Mapping[int, Type[BaseMessage]] = { tag: message_type for message_type, tag in MESSAGE_TAGS.items() }
+
+    def _sizes(self, kinds) -> Mapping[Type[BaseMessage], int]:
+        return { 
+            message_type: sum(kinds[kind][0] for _, kind in fields) for message_type, fields in MESSAGE_FIELDS.items() 
+        }
+
+    def encoded_size(self, message: BaseMessage) -> int:
+        if isinstance(message, Envelope):
+            return HEADER.size + self._envelope_body_size(message, self._ciphertext_table(message))
+        return HEADER.size + self._body_sizes[type(message)]
+
+    def encode(self, message: BaseMessage) -> bytes:
+        buffer = bytearray(self.encoded_size(message))
+        self.encode_into(message, buffer)
+        return bytes(buffer)
+
+    def encode_into(self, message: BaseMessage, buffer, offset: int = 0) -> int:
+        # Writes message's frame at buffer[offset:], returns the offset just past it
+        view = memoryview(buffer)
+        if isinstance(message, Envelope):
+            return self._encode_envelope_into(message, view, offset)
+
+        message_type = type(message)
+        HEADER.pack_into(view, offset, WIRE_VERSION, MESSAGE_TAGS[message_type], self._body_sizes[message_type])
+        return self._encode_fields_into(message, view, offset + HEADER.size, self._kinds, None)
+
+    def _encode_fields_into(self, message: BaseMessage, view: memoryview, offset: int, kinds, ciphertext_table) -> int:
+        for name, kind in MESSAGE_FIELDS[type(message)]:
+            width, encoder, _ = kinds[kind]
+            if encoder is None:
+                COUNT.pack_into(view, offset, ciphertext_table[getattr(message, name)])
+            else:
+                encoder(getattr(message, name), view[offset:offset + width])
+            offset += width
+
+        return offset
+
+    def _ciphertext_table(self, envelope: Envelope) -> Mapping[int, int]:
+        # distinct ciphertexts in the envelope -> index, in order of first use
+        table = {}
+        for message in envelope.messages:
+            if type(message) not in MESSAGE_FIELDS:
+                raise ValueError(f'Can not put a {type(message).__name__} in an envelope')
+            for name, kind in MESSAGE_FIELDS[type(message)]:
+                if kind == "ciphertext":
+                    table.setdefault(getattr(message, name), len(table))
+
+        return table
+
+    def _envelope_body_size(self, envelope: Envelope, ciphertext_table) -> int:
+        return (
+            COUNT.size + len(ciphertext_table) * self._ciphertext_bytes + COUNT.size + 
+            sum(1 + self._enveloped_body_sizes[type(each)] for each in envelope.messages)
+        )
+
+    def _encode_envelope_into(self, envelope: Envelope, view: memoryview, offset: int) -> int:
+        ciphertext_table = self._ciphertext_table(envelope)
+        HEADER.pack_into(view, offset, WIRE_VERSION, ENVELOPE_TAG, self._envelope_body_size(envelope, ciphertext_table))
+        offset += HEADER.size
+
+        COUNT.pack_into(view, offset, len(ciphertext_table))
+        offset += COUNT.size
+        for ciphertext in ciphertext_table:
+            self._encode_int(ciphertext, view[offset:offset + self._ciphertext_bytes])
+            offset += self._ciphertext_bytes
+
+        COUNT.pack_into(view, offset, len(envelope.messages))
+        offset += COUNT.size
+        for message in envelope.messages:
+            view[offset] = MESSAGE_TAGS[type(message)]
+            offset = self._encode_fields_into(message, view, offset + 1, self._enveloped_kinds, ciphertext_table)
+
+        return offset
+
+    def decode(self, data) -> BaseMessage:
+        message, offset = self.decode_from(data)
+        if offset != len(data):
+            raise ErrorDecodingMessage(f'{len(data) - offset} trailing bytes after the message')
+        return message
+
+    def decode_from(self, data, offset: int = 0) -> Tuple[BaseMessage, int]:
+        # Reads the frame at data[offset:], returns the message and the offset just past it
+        view = memoryview(data)
+        if len(view) - offset < HEADER.size:
+            raise ErrorDecodingMessage("Truncated header")
+
+        version, tag, body_size = HEADER.unpack_from(view, offset)
+        if version != WIRE_VERSION:
+            raise ErrorDecodingMessage(f'Unsupported wire version {version}')
+        offset += HEADER.size
+        if len(view) - offset < body_size:
+            raise ErrorDecodingMessage("Truncated body")
+
+        if tag == ENVELOPE_TAG:
+            end = offset + body_size
+            envelope, offset = self._decode_envelope(view[:end], offset)
+            if offset != end:
+                raise ErrorDecodingMessage("Bad envelope length")
+            return envelope, offset
+
+        message_type = self._message_type(tag)
+        if body_size != self._body_sizes[message_type]:
+            raise ErrorDecodingMessage(f'Bad body length {body_size} for {message_type.__name__}')
+
+        return self._decode_fields(message_type, view, offset, self._kinds, None)
+
+    def _message_type(self, tag: int) -> Type[BaseMessage]:
+        message_type = self._types_by_tag.get(tag)
+        if message_type is None:
+            raise ErrorDecodingMessage(f'Unknown message type {tag}')
+        return message_type
+
+    def _decode_fields(self, message_type: Type[BaseMessage], view: memoryview, offset: int, kinds, ciphertexts) -> Tuple[BaseMessage, int]:
+        values = {}
+        for name, kind in MESSAGE_FIELDS[message_type]:
+            width, _, decoder = kinds[kind]
+            if decoder is None:
+                index, = COUNT.unpack_from(view, offset)
+                if index >= len(ciphertexts):
+                    raise ErrorDecodingMessage("Ciphertext index out of range")
+                values[name] = ciphertexts[index]
+            else:
+                values[name] = decoder(view[offset:offset + width])
+            offset += width
+
+        return message_type(**values), offset
+
+    def _decode_envelope(self, view: memoryview, offset: int) -> Tuple[Envelope, int]:
+        # view ends where the envelope does, so running out of it is a truncated envelope
+        try:
+            ciphertext_count, = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+            ciphertexts = []
+            for _ in range(ciphertext_count):
+                if len(view) - offset < self._ciphertext_bytes:
+                    raise ErrorDecodingMessage("Truncated envelope")
+                ciphertexts.append(self._decode_int(view[offset:offset + self._ciphertext_bytes]))
+                offset += self._ciphertext_bytes
+
+            message_count, = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+            messages = []
+            for _ in range(message_count):
+                message_type = self._message_type(view[offset])
+                if len(view) - offset - 1 < self._enveloped_body_sizes[message_type]:
+                    raise ErrorDecodingMessage("Truncated envelope")
+                message, offset = self._decode_fields(message_type, view, offset + 1, self._enveloped_kinds, ciphertexts)
+                messages.append(message)
+        except (struct.error, IndexError):
+            raise ErrorDecodingMessage("Truncated envelope")
+
+        return Envelope(messages), offset
+
+    def _encode_int(self, value: int, out: memoryview):
+        try:
+            out[:] = value.to_bytes(len(out), 'big')
+        except OverflowError:
+            raise ValueError(f'{value} does not fit in {len(out)} bytes')
+
+    def _decode_int(self, data: memoryview) -> int:
+        return int.from_bytes(data, 'big')
+
+    def _decode_scalar(self, data: memoryview) -> int:
+        value = int.from_bytes(data, 'big')
+        if value >= self.order:
+            raise ErrorDecodingMessage("Scalar not reduced mod the curve order")
+        return value
+
+    def _encode_point(self, point: Point, out: memoryview):
+        out[:] = point.to_sec1()
+
+    def _decode_point(self, data: memoryview) -> Point:
+        try:
+            return Point.from_sec1(data, self.curve)
+        except ValueError as e:
+            raise ErrorDecodingMessage(f'Bad point: {e}')
+
+    def _encode_points(self, points: List[Point], out: memoryview):
+        if len(points) != self.threshold:
+            raise ValueError(f'Expected {self.threshold} commitments, got {len(points)}')
+        for i, point in enumerate(points):
+            self._encode_point(point, out[i * self._point_bytes:(i + 1) * self._point_bytes])
+
+    def _decode_points(self, data: memoryview) -> List[Point]:
+        return [ 
+            self._decode_point(data[offset:offset + self._point_bytes]) 
+            for offset in range(0, len(data), self._point_bytes) 
+        ]
+
+    def _encode_paillier_key(self, key: PaillierPublicKey, out: memoryview):
+        assert key.size == self.paillier_size, "Paillier key of the wrong size"
+        self._encode_int(key.n, out)
+
+    def _decode_paillier_key(self, data: memoryview) -> PaillierPublicKey:
+        n = int.from_bytes(data, 'big')
+        if n.bit_length() != self.paillier_size or n % 2 == 0:
+            raise ErrorDecodingMessage("Bad Paillier modulus")
+        return PaillierPublicKey(n, self.paillier_size)
@@ -0,0 +1,63 @@
+import unittest
+from dataclasses import replace
+from pytss.cluster import (
+    KEY_GEN_ROUNDS,
+    SIGNING_ROUNDS,
+    LinkProfile,
+    LocalCluster,
+    run
+)
+from pytss.gg20 import (
+    Parameters
+)
+from pytss.errors import (
+    PyTSSError
+)
+from pytss.elliptic_curve import (
+    secp256k1,
+    secp256k1_generator,
+    secp256k1_order
+)
+
+class TestCluster(unittest.TestCase):
+
+    def _params(self) -> Parameters:
+        return Parameters(
+            security_parameter=256,
+            paillier_security_parameter=1536,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+
+    def test_key_gen_and_signing(self):
+        # run() verifies every signature against the generated public key
+        key_gen_results, signing_results = run(self._params(), keygens=1, signings=2)
+
+        self.assertEqual(len(key_gen_results), 1)
+        self.assertEqual(set(key_gen_results[0].rounds), set(KEY_GEN_ROUNDS))
+        self.assertEqual([ each.session_id for each in signing_results ], [1, 2])
+        for each in signing_results:
+            self.assertEqual(set(each.rounds), set(SIGNING_ROUNDS))
+
+    def test_latency_and_batching(self):
+        link = LinkProfile(latency=0.05, bandwidth=10 ** 6)
+        _, signing_results = run(self._params(), keygens=1, signings=2, link=link, batching=True, concurrency=2)
+
+        # MtoA is a request and a response, then the delta and share broadcasts are one hop each
+        for each in signing_results:
+            self.assertGreaterEqual(each.seconds, 4 * link.latency)
+
+    def test_dropped_signing_sessions(self):
+        params = replace(self._params(), max_signing_sessions=2)
+        with LocalCluster(params) as cluster:
+            with self.assertRaises(ValueError):
+                cluster.sign([1, 2, 3], concurrency=3)
+            with self.assertRaises(PyTSSError):
+                cluster.sign([1])
+
+        # every session but the newest expires right away, and is reported rather than crashing the node
+        with self.assertRaisesRegex(PyTSSError, "dropped"):
+            run(replace(self._params(), signing_session_ttl=0.0), keygens=1, signings=2, concurrency=2)
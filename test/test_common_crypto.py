@@ -1,10 +1,91 @@
 import unittest
+from unittest.mock import patch
 from pytss.common_crypto import (
-    sha256_values
+    sha256_values,
+    is_prime,
+    prime_of_n_bits,
+    parallel_primes_of_n_bits,
+    search_prime_of_n_bits,
+    small_primes,
+    miller_rabin_rounds_for_bits,
+    strong_lucas_probable_prime
 )
 
 class TestCommonCrypto(unittest.TestCase):
 
     def test_sha256_list(self):
         values = [1, 2, 3]
-        print(sha256_values(values))
\ No newline at end of file
+        print(sha256_values(values))
+
+    def test_prime_of_n_bits_top_bits(self):
+        for _ in range(5):
+            prime = prime_of_n_bits(256, top_bits=2)
+            self.assertTrue(is_prime(prime))
+            self.assertEqual(prime >> 254, 0b11)
+
+    def test_small_primes(self):
+        primes = small_primes(1000)
+        self.assertEqual(primes[:5], [2, 3, 5, 7, 11])
+        self.assertEqual(primes[-1], 997)
+        self.assertTrue(all(is_prime(p) for p in primes))
+        self.assertEqual(len(small_primes(2 ** 16)), 6542)
+
+    def test_sieved_search_finds_first_prime(self):
+        # the sieve must never skip a prime: the search returns the first prime after its start
+        for start in [(1 << 127) + 1, (1 << 128) - 159, 0xc000000000000000000000000000000f]:
+            expected = start
+            while not is_prime(expected):
+                expected += 2
+
+            for sieve_bound in [3, 1000, 2 ** 16]:
+                with patch("pytss.common_crypto.secrets.randbits", return_value=start):
+                    self.assertEqual(search_prime_of_n_bits(128, 1, 1024, sieve_bound), expected)
+
+    def test_small_prime_of_n_bits(self):
+        # candidates below the sieve bound must not be sieved out by themselves
+        for n in [3, 4, 8, 16]:
+            for _ in range(10):
+                prime = prime_of_n_bits(n)
+                self.assertTrue(is_prime(prime))
+                self.assertEqual(prime.bit_length(), n)
+
+    def test_is_prime(self):
+        primes = set(small_primes(20000))
+        for candidate in range(3, 20000, 2):
+            self.assertEqual(is_prime(candidate), candidate in primes)
+            self.assertEqual(is_prime(candidate, baillie_psw=True), candidate in primes)
+
+        # Mersenne primes and a Mersenne composite, a Carmichael number and a base-2 strong pseudoprime
+        self.assertTrue(is_prime(2 ** 521 - 1, baillie_psw=True))
+        self.assertTrue(is_prime(2 ** 607 - 1))
+        self.assertFalse(is_prime(2 ** 523 - 1, baillie_psw=True))
+        self.assertFalse(is_prime(2 ** 523 - 1))
+        self.assertFalse(is_prime(1194649 * 1194649, baillie_psw=True))
+        self.assertFalse(is_prime(3215031751, baillie_psw=True))
+        self.assertFalse(is_prime(3825123056546413051, baillie_psw=True))
+
+    def test_strong_lucas_probable_prime(self):
+        # Lucas pseudoprimes that aren't strong Lucas pseudoprimes
+        for candidate in [323, 377, 1159, 1829, 3827]:
+            self.assertFalse(strong_lucas_probable_prime(candidate))
+        self.assertTrue(strong_lucas_probable_prime(2 ** 127 - 1))
+
+    def test_miller_rabin_rounds_for_bits(self):
+        self.assertEqual(miller_rabin_rounds_for_bits(256), 25)
+        self.assertEqual(miller_rabin_rounds_for_bits(1024), 4)
+        self.assertEqual(miller_rabin_rounds_for_bits(2048), 3)
+
+    def test_prime_of_n_bits_baillie_psw(self):
+        prime = prime_of_n_bits(512, top_bits=2, baillie_psw=True)
+        self.assertTrue(is_prime(prime))
+        self.assertEqual(prime.bit_length(), 512)
+
+    def test_parallel_primes_of_n_bits(self):
+        found = []
+        primes = parallel_primes_of_n_bits(256, 2, workers=2, top_bits=2, on_prime=found.append)
+
+        self.assertEqual(primes, found)
+        self.assertEqual(len(set(primes)), 2)
+        for prime in primes:
+            self.assertTrue(is_prime(prime))
+            self.assertEqual(prime.bit_length(), 256)
@@ -1,7 +1,11 @@
 import unittest
 from pytss.common_math import (
     compute_modular_inverse,
-    compute_modular_sqrt
+    compute_modular_sqrt,
+    batch_modular_inverse,
+    extended_euclidian,
+    jacobi_symbol,
+    legendre_symbol
 )
 
 class TestCommonMath(unittest.TestCase):
@@ -20,5 +24,33 @@ class TestCommonMath(unittest.TestCase):
         expected = 77350129032275108437581484883529059659442577067104103137820664936133073361349
         self.assertEqual(compute_modular_inverse(n, p), expected)
 
+    def test_compute_modular_inverse_matches_extended_euclid(self):
+        p = 115792089237316195423570985008687907852837564279074904382605163141518161494337
+        for a in [1, 2, p - 1, -5, p + 7, 2592341508477388788338039875332086003935577462794292637336102309357423871672]:
+            self.assertEqual(compute_modular_inverse(a, p), extended_euclidian(a, p).bezout_x % p)
+            self.assertEqual((compute_modular_inverse(a, p) * a) % p, 1)
+
+    def test_compute_modular_inverse_not_invertible(self):
+        with self.assertRaises(ValueError):
+            compute_modular_inverse(6, 26)
+        with self.assertRaises(ValueError):
+            batch_modular_inverse([3, 0, 5], 7)
+
     def test_compute_modular_sqrt(self):
-        self.assertEqual(compute_modular_sqrt(223, 17), 6)
\ No newline at end of file
+        self.assertEqual(compute_modular_sqrt(223, 17), 6)
+
+    def test_batch_modular_inverse(self):
+        p = 115792089237316195423570985008687907852837564279074904382605163141518161494337
+        values = [15, 2, p - 1, 2592341508477388788338039875332086003935577462794292637336102309357423871672]
+        self.assertEqual(batch_modular_inverse(values, p), [ compute_modular_inverse(each, p) for each in values ])
+        self.assertEqual(batch_modular_inverse([], p), [])
+
+    def test_jacobi_symbol(self):
+        for p in [3, 101, 997]:
+            for a in range(-5, 2 * p):
+                self.assertEqual(jacobi_symbol(a, p), legendre_symbol(a % p, p))
+
+        # (2/15) = (2/3)(2/5) = 1 although 2 is not a square mod 15
+        self.assertEqual(jacobi_symbol(2, 15), 1)
+        self.assertEqual(jacobi_symbol(7, 15), -1)
+        self.assertEqual(jacobi_symbol(6, 15), 0)
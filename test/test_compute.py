@@ -0,0 +1,43 @@
+import unittest
+from pytss.compute import (
+    InlineComputeBackend,
+    ProcessPoolComputeBackend,
+    _homomorphic_multiply
+)
+from pytss.elliptic_curve import (
+    secp256k1_generator,
+    secp256k1_order
+)
+from pytss.paillier import (
+    generate_key_pair
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+
+class TestCompute(unittest.TestCase):
+
+    def _test_backend(self, backend):
+        public, private = generate_key_pair(256)
+
+        plaintexts = list(range(20))
+        ciphertexts = [ backend.encrypt(public, each) for each in plaintexts ]
+        ciphertexts = [ each.result() for each in ciphertexts ]
+        self.assertEqual([ backend.decrypt(private, each).result() for each in ciphertexts ], plaintexts)
+
+        # batches come back in submission order
+        products = backend.map(_homomorphic_multiply, [ (public, ct, 3) for ct in ciphertexts ])
+        self.assertEqual([ private.decrypt(each) for each in products ], [ 3 * each for each in plaintexts ])
+
+        k = gen_random_int(1, secp256k1_order)
+        self.assertEqual(backend.scalar_multiply(k, secp256k1_generator).result(), k * secp256k1_generator)
+
+    def test_inline_backend(self):
+        self._test_backend(InlineComputeBackend())
+
+    def test_process_pool_backend(self):
+        backend = ProcessPoolComputeBackend(max_workers=2)
+        try:
+            self._test_backend(backend)
+        finally:
+            backend.close()
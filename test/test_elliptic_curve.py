@@ -3,7 +3,11 @@ from pytss.elliptic_curve import (
     Point,
     Signature,
     PrivateKey,
-    secp256k1
+    secp256k1,
+    secp256k1_generator,
+    multi_scalar_mul,
+    verify_batch,
+    wnaf
 )
 from pytss.common_crypto import (
     gen_random_int
@@ -38,6 +42,95 @@ class TestEllipticCurve(unittest.TestCase):
         e: int = 2 ** 240 + 2 ** 31
         self.assertTrue(e * G == pub)
 
+    def test_point_arithmetic(self):
+        self.assertEqual(G + G, 2 * G)
+        self.assertEqual(G + G + G, 3 * G)
+        self.assertEqual(5 * G + 7 * G, 12 * G)
+        self.assertEqual(G + (N - 1) * G, I)
+        self.assertEqual(0 * G, I)
+        self.assertEqual(I + G, G)
+        self.assertEqual(G + I, G)
+
+    def test_fixed_base_table(self):
+        P = 12345 * G
+        P.precompute(window_bits=5)
+        for k in [1, 2, 31, 32, 2 ** 255 + 17, N - 1, gen_random_int(0, N)]:
+            self.assertEqual(k * secp256k1_generator, k * G)
+            self.assertEqual(k * P, (12345 * k) * G)
+
+        self.assertEqual(N * secp256k1_generator, I)
+
+    def test_wnaf(self):
+        for width in [2, 4, 5, 8]:
+            k = gen_random_int(0, N)
+            digits = wnaf(k, width)
+            self.assertEqual(sum(d * 2 ** i for i, d in enumerate(digits)), k)
+            for i, d in enumerate(digits):
+                if d:
+                    self.assertTrue(d % 2 == 1 and abs(d) < 2 ** (width - 1))
+                    self.assertFalse(any(digits[i + 1:i + width]))
+
+    def test_scalar_multiplication_variants(self):
+        k = gen_random_int(0, N)
+        expected = k * secp256k1_generator
+        for width in [2, 3, 5, 7]:
+            self.assertEqual(G.multiply(k, window_bits=width), expected)
+        self.assertEqual(G.multiply(k, constant_time=True), expected)
+        self.assertEqual(G.multiply(0, constant_time=True), I)
+        self.assertEqual((-k) * G, -expected)
+        self.assertEqual(expected + (-expected), I)
+
+    def test_multi_scalar_mul(self):
+        for count in [1, 2, 5, 130]:
+            terms = [ (gen_random_int(0, N), gen_random_int(1, N) * G) for _ in range(count) ]
+            expected = I
+            for k, P in terms:
+                expected = expected + k * P
+
+            self.assertEqual(multi_scalar_mul(terms), expected)
+            self.assertEqual(multi_scalar_mul(terms + [(7, secp256k1_generator)]), expected + 7 * G)
+
+        self.assertEqual(multi_scalar_mul([(3, G), (-3, G)]), I)
+        self.assertEqual(multi_scalar_mul([(0, G), (5, I)]), I)
+
+    def test_glv_matches_generic(self):
+        import pytss.elliptic_curve as elliptic_curve
+        P = gen_random_int(1, N) * G
+        scalars = [0, 1, N - 1, N, N + 5, gen_random_int(0, N), gen_random_int(0, 2 ** 300)]
+
+        elliptic_curve.ENABLE_GLV = False
+        try:
+            expected = [ k * P for k in scalars ]
+            expected_msm = multi_scalar_mul([ (k, P) for k in scalars ])
+        finally:
+            elliptic_curve.ENABLE_GLV = True
+
+        self.assertEqual([ k * P for k in scalars ], expected)
+        self.assertEqual(multi_scalar_mul([ (k, P) for k in scalars ]), expected_msm)
+
+    def test_point_validation(self):
+        with self.assertRaises(ValueError):
+            Point(x=G.x.value, y=G.y.value + 1, curve=secp256k1)
+
+        # non-canonical coordinates are rejected too
+        with self.assertRaises(ValueError):
+            Point(x=G.x.value + secp256k1.field.prime, y=G.y.value, curve=secp256k1)
+
+        self.assertTrue((5 * G).is_valid())
+        self.assertFalse(I.is_valid())
+        self.assertFalse(Point._trusted(1, 1, secp256k1).is_valid())
+
+    def test_sec1_encoding(self):
+        P = gen_random_int(1, N) * G
+        self.assertEqual(G.to_sec1().hex(), "0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798")
+        self.assertEqual(Point.from_sec1(P.to_sec1(), secp256k1), P)
+        self.assertEqual(Point.from_sec1(memoryview(P.to_sec1(compressed=False)), secp256k1), P)
+        self.assertEqual(Point.from_sec1(bytearray((-P).to_sec1()), secp256k1), -P)
+
+        for bad in [b"", b"\x05" + bytes(32), b"\x02" + b"\xff" * 32, b"\x04" + P.to_sec1()[1:] * 2]:
+            with self.assertRaises(ValueError):
+                Point.from_sec1(bad, secp256k1)
+
     def test_ecdsa(self):
         pub = Point(
             x=0x887387E452B8EACC4ACFDE10D9AAF7F6D9A0F975AABB10D006E4DA568744D06C,
@@ -61,6 +154,34 @@ class TestEllipticCurve(unittest.TestCase):
         recovered_key = signature.recover_public_key(z)
         print(recovered_key)
         self.assertTrue(signature.verify(z, recovered_key))
+        self.assertEqual(recovered_key, pub)
+
+    def test_verify_batch(self):
+        items = []
+        for _ in range(6):
+            e = PrivateKey(gen_random_int(1, N), secp256k1_generator, N)
+            z = gen_random_int(0, 2 ** 256)
+            items.append((z, e.sign(z), e.secret * G))
+
+        # no recovery id, so checked on its own
+        z, signature, pub = items[0]
+        items[0] = (z, Signature(signature.r, signature.s, signature.G, signature.N), pub)
+
+        result = verify_batch(items)
+        self.assertTrue(result.valid)
+        self.assertEqual(result.failed, [])
+
+        z, signature, pub = items[2]
+        items[2] = (z + 1, signature, pub)
+        z, signature, pub = items[4]
+        items[4] = (z, Signature(signature.r, signature.s, signature.G, signature.N, 1 - signature.recovery_id), pub)
+        z, signature, pub = items[5]
+        items[5] = (z, Signature(signature.r, 0, signature.G, signature.N), pub)
+
+        result = verify_batch(items)
+        self.assertFalse(result.valid)
+        # a wrong recovery id alone does not invalidate an ECDSA signature
+        self.assertEqual(result.failed, [2, 5])
 
     def test_pem_encoding(self):
         sec = PrivateKey(gen_random_int(0, N), G, N)
@@ -4,7 +4,8 @@ from pytss.gg20 import (
     Participant,
     Parameters,
     CommunicationDelegate,
-    BaseMessage
+    BaseMessage,
+    KeyGenP2P
 )
 from pytss.elliptic_curve import (
     secp256k1,
@@ -20,6 +21,12 @@ from pytss.common_crypto import (
 from pytss.secret_sharing import (
     recover_secret
 )
+from pytss.paillier import (
+    PaillierKeyPool
+)
+from pytss.errors import (
+    ErrorVerifyingShare
+)
 
 class TestDelegate(CommunicationDelegate):
 
@@ -35,6 +42,17 @@ class TestDelegate(CommunicationDelegate):
             if participant.participant_id == recipient_id:
                 participant.receive_message(sender_id, message) 
 
+class TamperingDelegate(TestDelegate):
+    # Corrupts the key generation shares sent by one participant
+
+    def __init__(self, bad_sender_id: int):
+        super().__init__()
+        self.bad_sender_id = bad_sender_id
+
+    def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        if sender_id == self.bad_sender_id and isinstance(message, KeyGenP2P):
+            message = KeyGenP2P((message.shamir_share + 1) % secp256k1_order)
+        super().send(sender_id, recipient_id, message)
 
 class TestGG20(unittest.TestCase):
 
@@ -191,6 +209,155 @@ class TestGG20(unittest.TestCase):
             self.assertTrue(each.verify(message, public_key))
             print("Verified signature")
 
+    def _key_gen(self, params: Parameters, paillier_key_source=None) -> List[Participant]:
+        participants: List[Participant] = []
+        test_delegate = TestDelegate()
+        for i in range(1, params.party_size + 1):
+            participants.append(
+                Participant(
+                    delegate=test_delegate,
+                    party_parameters=params,
+                    participant_id=i
+                )
+            )
+        test_delegate.participants = participants
+
+        for each in participants:
+            each.key_gen(paillier_key_source)
+
+        return participants
+
+    def test_key_gen_with_paillier_key_pool(self):
+        params = Parameters(
+            security_parameter=256,
+            paillier_security_parameter=1536,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+        pool = PaillierKeyPool(params.paillier_security_parameter, high_water_mark=0)
+        pairs = [ pool.take() for _ in range(params.party_size) ]
+        pool.close()
+
+        participants = self._key_gen(params, iter(pairs).__next__)
+
+        for each, (public, private) in zip(participants, pairs):
+            self.assertIs(each.key_gen_state.paillier_secret_key, private)
+            for other in participants:
+                if other is not each:
+                    self.assertEqual(other.key_gen_state.other_paillier_public_keys_by_id[each.participant_id].n, public.n)
+        self.assertEqual(participants[0].public_key(), participants[2].public_key())
 
+    def test_key_gen_verifies_shares(self):
+        params = Parameters(
+            security_parameter=256,
+            paillier_security_parameter=512,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+        participants = self._key_gen(params)
+        for each in participants:
+            self.assertIsNotNone(each.key_gen_state.x)
+            self.assertEqual(len(each.key_gen_state.other_commitments_by_id[2]), params.threshold)
 
+        delegate = TamperingDelegate(bad_sender_id=2)
+        participants = [ Participant(i, delegate, params) for i in range(1, params.party_size + 1) ]
+        delegate.participants = participants
+
+        with self.assertRaises(ErrorVerifyingShare) as context:
+            for each in participants:
+                each.key_gen()
+        self.assertEqual(context.exception.sender_ids, [2])
+
+    def test_presigning(self):
+        params = Parameters(
+            security_parameter=256,
+            paillier_security_parameter=1536,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+        participants = self._key_gen(params)
+        public_key = participants[0].public_key()
+
+        # offline: two presignatures for signers {1, 3}, one for {2, 3}
+        for presignature_id, signer_ids in [(1, {1, 3}), (2, {1, 3}), (3, {2, 3})]:
+            for each in participants:
+                if each.participant_id in signer_ids:
+                    each.presign(signer_ids, presignature_id)
+
+        self.assertEqual(list(participants[2].presignatures), [1, 2, 3])
+        self.assertEqual(list(participants[1].presignatures), [3])
+
+        # online: one broadcast round per signature
+        for presignature_id, signer_ids in [(2, {1, 3}), (3, {2, 3}), (1, {1, 3})]:
+            message = gen_random_int(0, 2 ** params.security_parameter)
+            signers = [ each for each in participants if each.participant_id in signer_ids ]
+            for each in signers:
+                each.sign(message, presignature_id)
+
+            for each in signers:
+                self.assertTrue(each.signature().verify(message, public_key))
+
+        for each in participants:
+            self.assertEqual(len(each.presignatures), 0)
+
+    def test_concurrent_signing_sessions(self):
+        params = Parameters(
+            security_parameter=256,
+            paillier_security_parameter=1536,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order,
+            max_signing_sessions=3
+        )
+        participants = self._key_gen(params)
+        public_key = participants[0].public_key()
+
+        sessions = {
+            101: ({1, 2}, gen_random_int(0, 2 ** params.security_parameter)),
+            102: ({2, 3}, gen_random_int(0, 2 ** params.security_parameter)),
+            103: ({1, 2}, gen_random_int(0, 2 ** params.security_parameter))
+        }
+
+        # every session is set up before any of them starts, and signers join in different orders
+        for session_id, (signer_ids, message) in sessions.items():
+            for each in reversed(participants):
+                if each.participant_id in signer_ids:
+                    each.prepare_for_signing(message, signer_ids, session_id)
+
+        for session_id, (signer_ids, message) in reversed(sessions.items()):
+            for each in participants:
+                if each.participant_id in signer_ids:
+                    each.sign(session_id=session_id)
+
+        for session_id, (signer_ids, message) in sessions.items():
+            for each in participants:
+                if each.participant_id in signer_ids:
+                    self.assertTrue(each.signature(session_id).verify(message, public_key))
+
+        # the oldest session makes way once we're past max_signing_sessions
+        participants[1].prepare_for_signing(0, {1, 2}, 104)
+        self.assertEqual(list(participants[1].signing_sessions), [102, 103, 104])
+
+        # a message for a session that isn't set up yet is buffered without dropping any
+        participants[0].prepare_for_signing(0, {1, 2}, 105)
+        participants[0].sign(session_id=105)
+        self.assertEqual(list(participants[1].signing_sessions), [102, 103, 104])
+        self.assertEqual(len(participants[1]._pending_signing_messages[105][1]), 2)
+
+        # and a peer can't grow the buffer past what a session needs
+        pending_message = participants[1]._pending_signing_messages[105][1][0][1]
+        for _ in range(10):
+            participants[1].receive_message(1, pending_message)
+        self.assertEqual(len(participants[1]._pending_signing_messages[105][1]), 2 * (params.party_size - 1))
 
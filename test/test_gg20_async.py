@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from typing import Dict
+from pytss.gg20 import (
+    Parameters,
+    BaseMessage,
+    SigningPostMtoABroadcast
+)
+from pytss.gg20_async import (
+    AsyncCommunicationDelegate,
+    AsyncParticipantDriver
+)
+from pytss.elliptic_curve import (
+    Point,
+    secp256k1,
+    secp256k1_generator,
+    secp256k1_order
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+from pytss.compute import (
+    ProcessPoolComputeBackend
+)
+
+class TestAsyncDelegate(AsyncCommunicationDelegate):
+
+    def __init__(self):
+        self.drivers: Dict[int, AsyncParticipantDriver] = {}
+
+    async def broadcast(self, sender_id: int, message: BaseMessage):
+        await asyncio.gather(*[ each.deliver(sender_id, message) for each in self.drivers.values() ])
+
+    async def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        # some made up network latency
+        await asyncio.sleep(0.001 * recipient_id)
+        await self.drivers[recipient_id].deliver(sender_id, message)
+
+class TestGG20Async(unittest.TestCase):
+
+    def test_async_e2e(self):
+        self._test_async_e2e()
+
+    def test_async_e2e_with_process_pool(self):
+        compute_backend = ProcessPoolComputeBackend(max_workers=2)
+        try:
+            self._test_async_e2e(compute_backend)
+        finally:
+            compute_backend.close()
+
+    def _test_async_e2e(self, compute_backend=None):
+        params = Parameters(
+            security_parameter=256,
+            paillier_security_parameter=1536,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+
+        async def run():
+            delegate = TestAsyncDelegate()
+            for i in range(1, params.party_size + 1):
+                delegate.drivers[i] = AsyncParticipantDriver(i, delegate, params, compute_backend=compute_backend)
+            drivers = list(delegate.drivers.values())
+
+            await asyncio.gather(*[ each.key_gen() for each in drivers ])
+            public_key = drivers[0].participant.public_key()
+
+            # two concurrent sessions, plus a presignature
+            messages = { 1: gen_random_int(0, 2 ** 256), 2: gen_random_int(0, 2 ** 256) }
+            signatures = await asyncio.gather(
+                drivers[0].sign(messages[1], {1, 2}, session_id=1),
+                drivers[1].sign(messages[1], {1, 2}, session_id=1),
+                drivers[1].sign(messages[2], {2, 3}, session_id=2),
+                drivers[2].sign(messages[2], {2, 3}, session_id=2),
+                drivers[0].presign({1, 3}, session_id=3),
+                drivers[2].presign({1, 3}, session_id=3)
+            )
+
+            self.assertTrue(signatures[0].verify(messages[1], public_key))
+            self.assertEqual(signatures[0], signatures[1])
+            self.assertTrue(signatures[2].verify(messages[2], public_key))
+
+            message = gen_random_int(0, 2 ** 256)
+            signatures = await asyncio.gather(
+                drivers[0].sign_with_presignature(message, 3),
+                drivers[2].sign_with_presignature(message, 3)
+            )
+            self.assertTrue(signatures[0].verify(message, public_key))
+
+            for each in drivers:
+                await each.stop()
+
+        asyncio.run(run())
+
+    def test_failed_session_does_not_break_others(self):
+        params = Parameters(
+            security_parameter=256,
+            paillier_security_parameter=1536,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+
+        async def run():
+            delegate = TestAsyncDelegate()
+            for i in range(1, params.party_size + 1):
+                delegate.drivers[i] = AsyncParticipantDriver(i, delegate, params)
+            drivers = list(delegate.drivers.values())
+
+            await asyncio.gather(*[ each.key_gen() for each in drivers ])
+            public_key = drivers[0].participant.public_key()
+
+            # the point at infinity for session 1 fails only that session
+            await drivers[1]._step(drivers[1].participant.prepare_for_signing, 0, {1, 2}, 1)
+            await drivers[1].deliver(1, SigningPostMtoABroadcast(1, Point(x=None, y=None, curve=secp256k1), 1))
+            with self.assertRaises(ValueError):
+                await drivers[1]._wait_for(lambda: False, 1)
+
+            message = gen_random_int(0, 2 ** 256)
+            signatures = await asyncio.gather(
+                drivers[1].sign(message, {2, 3}, session_id=2),
+                drivers[2].sign(message, {2, 3}, session_id=2)
+            )
+            self.assertTrue(signatures[0].verify(message, public_key))
+
+            for each in drivers:
+                await each.stop()
+
+        asyncio.run(run())
@@ -1,8 +1,23 @@
+import io
+import os
+import tempfile
+import time
 import unittest
-from pytss.paillier import generate_key_pair
+from pytss.paillier import (
+    generate_key_pair,
+    PaillierRandomnessPool,
+    PaillierKeyPool
+)
+from pytss.errors import (
+    ErrorUnsealing
+)
 from pytss.utils import (
     Converters
 )
+from pytss.compute import (
+    InlineComputeBackend,
+    ProcessPoolComputeBackend
+)
 
 class TestPrimeGeneration(unittest.TestCase):
 
@@ -44,6 +59,34 @@ class TestPrimeGeneration(unittest.TestCase):
         decrypted = private.decrypt_b64(encrypted)
         self.assertEqual(decrypted, sample_text)
 
+    def test_encrypt_stream(self):
+        public, private = generate_key_pair(512)
+        chunk_bytes = 512 // 8 - 1
+
+        # zeros at either end, and lengths around the chunk size
+        for data in [b"", b"\x00", b"\x00\x00ab\x00", os.urandom(chunk_bytes), b"\x00" * (3 * chunk_bytes + 1)]:
+            encrypted = public.encrypt_bytes(data)
+            self.assertEqual(len(encrypted), -(-len(data) // chunk_bytes) * 2 * 64)
+            self.assertEqual(private.decrypt_bytes(encrypted), data)
+
+        data = os.urandom(10 * chunk_bytes + 5)
+        ciphertext = io.BytesIO()
+        for chunk in public.encrypt_stream(io.BytesIO(data), InlineComputeBackend(), window=3):
+            ciphertext.write(chunk)
+        ciphertext.seek(0)
+        self.assertEqual(b"".join(private.decrypt_stream(ciphertext)), data)
+
+        backend = ProcessPoolComputeBackend(max_workers=2)
+        try:
+            encrypted = b"".join(public.encrypt_stream(memoryview(data), backend))
+            self.assertEqual(b"".join(private.decrypt_stream(encrypted, backend)), data)
+        finally:
+            backend.close()
+
+        for bad in [encrypted[:-1], public.encrypt(0).to_bytes(128, 'big')]:
+            with self.assertRaises(ValueError):
+                private.decrypt_bytes(bad)
+
     def test_homomorphic_plaintext_add(self):
         plaintext_a = 5 
         plaintext_b = 6 
@@ -68,3 +111,82 @@ class TestPrimeGeneration(unittest.TestCase):
         
         decrypted = private.decrypt(homomorphic_product)
         self.assertEqual(message * constant, decrypted)
+
+    def test_crt_decryption_matches_textbook_decryption(self):
+        public, private = generate_key_pair(256)
+
+        for message in [0, 1, 2 ** 200 + 17, public.n - 1]:
+            ciphertext = public.encrypt(message)
+            textbook = (private._l_function(pow(ciphertext, private.lam, private.n_squared)) * private.mu) % private.n
+            self.assertEqual(private.decrypt(ciphertext), textbook)
+            self.assertEqual(private.decrypt(ciphertext), message)
+
+    def test_encryption_uses_fresh_randomness(self):
+        public, private = generate_key_pair(256)
+
+        self.assertNotEqual(public.encrypt(42), public.encrypt(42))
+        self.assertEqual(private.decrypt(public.encrypt(42)), 42)
+
+    def test_randomness_pool(self):
+        public, private = generate_key_pair(256)
+
+        # CRT masks from the private key are valid r^n masks for the public key
+        public.randomness_pool = PaillierRandomnessPool(private, depth=4)
+        try:
+            ciphertexts = [ public.encrypt(each) for each in range(10) ]
+        finally:
+            public.randomness_pool.close()
+
+        self.assertEqual(len(set(ciphertexts)), 10)
+        self.assertEqual([ private.decrypt(each) for each in ciphertexts ], list(range(10)))
+
+    def test_parallel_key_generation(self):
+        stages = []
+        public, private = generate_key_pair(512, workers=2, progress=lambda stage, elapsed: stages.append(stage))
+
+        self.assertEqual(stages, ["p", "q", "done"])
+        self.assertEqual(public.n.bit_length(), 512)
+        self.assertEqual(private.decrypt(public.encrypt(1234)), 1234)
+
+    def _wait_for_pool(self, pool: PaillierKeyPool, size: int):
+        deadline = time.monotonic() + 60
+        while len(pool) < size and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pool), size)
+
+    def test_key_pool(self):
+        pool = PaillierKeyPool(512, high_water_mark=2)
+        try:
+            self._wait_for_pool(pool, 2)
+            pairs = [ pool.take() for _ in range(3) ]
+        finally:
+            pool.close()
+
+        self.assertEqual(len({ public.n for public, _ in pairs }), 3)
+        for public, private in pairs:
+            self.assertEqual(public.n.bit_length(), 512)
+            self.assertEqual(private.decrypt(public.encrypt(1234)), 1234)
+
+    def test_persistent_key_pool(self):
+        with tempfile.TemporaryDirectory() as path:
+            pool = PaillierKeyPool(512, high_water_mark=2, path=path, passphrase=b"correct horse")
+            self._wait_for_pool(pool, 2)
+            pool.close()
+            public, _ = pool.take()
+
+            # only the pair still in the pool is on disk, and not in the clear
+            key_files = [ each for each in os.listdir(path) if each.endswith(PaillierKeyPool.KEY_FILE_SUFFIX) ]
+            self.assertEqual(len(key_files), 1)
+            with open(os.path.join(path, key_files[0]), "rb") as f:
+                self.assertNotIn(str(pool._pairs[0][2].p).encode(), f.read())
+
+            with self.assertRaises(ErrorUnsealing):
+                PaillierKeyPool(512, high_water_mark=0, path=path, passphrase=b"wrong")
+
+            reopened = PaillierKeyPool(512, high_water_mark=0, path=path, passphrase=b"correct horse")
+            reopened_public, reopened_private = reopened.take()
+            reopened.close()
+            self.assertEqual(reopened_public.n, pool._pairs[0][1].n)
+            self.assertNotEqual(reopened_public.n, public.n)
+            self.assertEqual(reopened_private.decrypt(reopened_public.encrypt(99)), 99)
+
@@ -1,7 +1,18 @@
 import unittest
 from pytss.secret_sharing import (
     split_into_shares,
-    recover_secret
+    recover_secret,
+    evaluate_polynomial,
+    _evaluate_polynomial,
+    lagrange_coefficients,
+    LagrangeCache,
+    split_into_verifiable_shares,
+    verify_share,
+    verify_shares
+)
+from pytss.elliptic_curve import (
+    secp256k1_generator,
+    secp256k1_order
 )
 import random
 
@@ -53,3 +64,70 @@ class TestSecretSharing(unittest.TestCase):
         recovered_secret = recover_secret(tuples[0:2], prime)
 
         self.assertEqual(recovered_secret, secret)
+
+    def test_evaluate_polynomial(self):
+        coefficients = [ random.randrange(PRIME) for _ in range(20) ]
+        naive = lambda x: sum(c * pow(x, i, PRIME) for i, c in enumerate(coefficients)) % PRIME
+
+        xs = list(range(1, 101)) + [ random.randrange(PRIME) for _ in range(5) ]
+        self.assertEqual(evaluate_polynomial(coefficients, xs, PRIME), [ naive(x) for x in xs ])
+        self.assertEqual([ _evaluate_polynomial(coefficients, x, PRIME) for x in xs ], [ naive(x) for x in xs ])
+        self.assertEqual(evaluate_polynomial([7], [0, 1, 2], PRIME), [7, 7, 7])
+        self.assertEqual(evaluate_polynomial(coefficients, [], PRIME), [])
+
+    def test_large_party(self):
+        secret = random.randrange(PRIME)
+        shares = split_into_shares(secret, 100, 50, PRIME)
+
+        self.assertEqual([ x for x, _ in shares ], list(range(1, 101)))
+        self.assertEqual(recover_secret(random.sample(shares, 50), PRIME), secret)
+        self.assertNotEqual(recover_secret(random.sample(shares, 49), PRIME), secret)
+
+    def test_lagrange_coefficients(self):
+        xs = [2, 5, 7, 11]
+        expected = []
+        for i in xs:
+            coefficient = 1
+            for j in xs:
+                if j != i:
+                    coefficient = coefficient * j * pow(j - i, -1, PRIME) % PRIME
+            expected.append(coefficient)
+
+        self.assertEqual(lagrange_coefficients(xs, PRIME), expected)
+        # they interpolate any polynomial of degree < len(xs) at 0
+        coefficients = [ random.randrange(PRIME) for _ in range(len(xs)) ]
+        ys = evaluate_polynomial(coefficients, xs, PRIME)
+        self.assertEqual(sum(l * y for l, y in zip(expected, ys)) % PRIME, coefficients[0])
+
+    def test_lagrange_cache(self):
+        cache = LagrangeCache(max_size=6)
+        expected = dict(zip([1, 3, 4], lagrange_coefficients([1, 3, 4], PRIME)))
+
+        self.assertEqual(cache.coefficient({4, 1, 3}, 3, PRIME), expected[3])
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.coefficients([4, 1, 3], PRIME), [expected[4], expected[1], expected[3]])
+        self.assertEqual(len(cache), 3)
+
+        # another set, and the least recently used entries of the first one make way
+        cache.coefficient({1, 2}, 1, PRIME)
+        cache.coefficient({2, 3, 4, 5}, 2, PRIME)
+        self.assertEqual(len(cache), 6)
+        self.assertEqual(cache.coefficient({1, 3, 4}, 1, PRIME), expected[1])
+
+    def test_verifiable_shares(self):
+        G, N = secp256k1_generator, secp256k1_order
+        dealings = [ split_into_verifiable_shares(random.randrange(N), 5, 3, G, N) for _ in range(4) ]
+        for shares, commitments in dealings:
+            self.assertEqual(len(commitments), 3)
+            self.assertEqual(recover_secret(shares[:3], N) * G, commitments[0])
+            for x, y in shares:
+                self.assertTrue(verify_share(x, y, commitments, G, N))
+            self.assertFalse(verify_share(2, shares[0][1], commitments, G, N))
+
+        # participant 2's shares from every dealer, checked together
+        received = { dealer: (shares[1][1], commitments) for dealer, (shares, commitments) in enumerate(dealings, start=1) }
+        self.assertEqual(verify_shares(2, received, G, N), [])
+
+        received[1] = ((received[1][0] + 1) % N, received[1][1])
+        received[3] = (received[3][0], received[4][1])
+        self.assertEqual(verify_shares(2, received, G, N), [1, 3])
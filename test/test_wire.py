@@ -0,0 +1,220 @@
+import unittest
+from typing import List
+from pytss.wire import (
+    WireCodec,
+    HEADER,
+    WIRE_VERSION
+)
+from pytss.gg20 import (
+    BaseMessage,
+    BatchingDelegate,
+    CommunicationDelegate,
+    Envelope,
+    KeyGenBroadcast,
+    KeyGenP2P,
+    MtoAP2P1,
+    MtoAP2P1Response,
+    MtoABroadcast1,
+    MtoAP2P2,
+    MtoAP2P2Response,
+    Parameters,
+    Participant,
+    SigningPostMtoABroadcast,
+    SigningShare
+)
+from pytss.elliptic_curve import (
+    _is_x_coordinate,
+    secp256k1,
+    secp256k1_generator,
+    secp256k1_order
+)
+from pytss.paillier import (
+    generate_key_pair
+)
+from pytss.errors import (
+    ErrorDecodingMessage
+)
+from pytss.common_crypto import (
+    gen_random_int
+)
+
+class WireDelegate(CommunicationDelegate):
+    # Every message goes through the codec on its way to the recipient
+
+    def __init__(self, codec: WireCodec):
+        self.codec = codec
+        self.participants: List[Participant] = []
+        self.bytes_sent = 0
+        self.sends = 0
+
+    def _deliver(self, sender_id: int, recipient: Participant, message: BaseMessage):
+        data = self.codec.encode(message)
+        self.bytes_sent += len(data)
+        recipient.receive_message(sender_id, self.codec.decode(data))
+
+    def broadcast(self, sender_id: int, message: BaseMessage):
+        self.sends += 1
+        for participant in self.participants:
+            self._deliver(sender_id, participant, message)
+
+    def send(self, sender_id: int, recipient_id: int, message: BaseMessage):
+        self.sends += 1
+        self._deliver(sender_id, self.participants[recipient_id - 1], message)
+
+class TestWire(unittest.TestCase):
+
+    def _params(self, paillier_security_parameter: int) -> Parameters:
+        return Parameters(
+            security_parameter=256,
+            paillier_security_parameter=paillier_security_parameter,
+            party_size=3,
+            threshold=2,
+            ec=secp256k1,
+            ec_g=secp256k1_generator,
+            ec_n=secp256k1_order
+        )
+
+    def test_round_trip(self):
+        params = self._params(512)
+        codec = WireCodec(params)
+        public, _ = generate_key_pair(512)
+        point = gen_random_int(1, secp256k1_order) * secp256k1_generator
+        scalar = gen_random_int(1, secp256k1_order)
+        ciphertext = public.encrypt(scalar)
+
+        messages = [
+            KeyGenBroadcast(point, public, [point, 2 * point]),
+            KeyGenP2P(scalar),
+            MtoAP2P1(ciphertext, 7),
+            MtoAP2P1Response(ciphertext, 7),
+            MtoABroadcast1(point, 2 ** 64 - 1),
+            MtoAP2P2(ciphertext),
+            MtoAP2P2Response(ciphertext, 7),
+            SigningPostMtoABroadcast(scalar, point, 7),
+            SigningShare(scalar, 7)
+        ]
+        for message in messages:
+            data = codec.encode(message)
+            self.assertEqual(len(data), codec.encoded_size(message))
+            decoded = codec.decode(data)
+            self.assertEqual(type(decoded), type(message))
+            if isinstance(message, KeyGenBroadcast):
+                self.assertEqual(decoded.y, message.y)
+                self.assertEqual(decoded.paillier_pk.n, public.n)
+                self.assertEqual(decoded.commitments, message.commitments)
+            else:
+                self.assertEqual(decoded, message)
+
+        self.assertEqual(len(codec.encode(MtoABroadcast1(point, 7))), HEADER.size + 33 + 8)
+        self.assertEqual(len(codec.encode(SigningShare(scalar, 7))), HEADER.size + 32 + 8)
+        self.assertEqual(len(codec.encode(MtoAP2P1(ciphertext, 7))), HEADER.size + 128 + 8)
+
+        # frames back to back in one buffer, decoded in place
+        buffer = bytearray(sum(codec.encoded_size(each) for each in messages[1:]))
+        offset = 0
+        for message in messages[1:]:
+            offset = codec.encode_into(message, buffer, offset)
+        offset = 0
+        for message in messages[1:]:
+            decoded, offset = codec.decode_from(buffer, offset)
+            self.assertEqual(decoded, message)
+        self.assertEqual(offset, len(buffer))
+
+    def test_envelope(self):
+        codec = WireCodec(self._params(512))
+        public, _ = generate_key_pair(512)
+        point = gen_random_int(1, secp256k1_order) * secp256k1_generator
+        encrypted_k = public.encrypt(5)
+
+        envelope = Envelope([
+            MtoAP2P1(encrypted_k, 1),
+            MtoAP2P2(encrypted_k, 1),
+            MtoAP2P1(encrypted_k, 2),
+            MtoAP2P2(encrypted_k, 2),
+            MtoAP2P1Response(public.encrypt(6), 3),
+            SigningPostMtoABroadcast(7, point, 4)
+        ])
+        data = codec.encode(envelope)
+        self.assertEqual(len(data), codec.encoded_size(envelope))
+        self.assertEqual(codec.decode(data), envelope)
+
+        # the shared encrypted k goes out once
+        separately = sum(codec.encoded_size(each) for each in envelope.messages)
+        self.assertEqual(len(data), HEADER.size + 2 + 2 * 128 + 2 + 5 * (1 + 2 + 8) + (1 + 32 + 33 + 8))
+        self.assertLess(len(data), separately - 3 * 128)
+
+        for frame in [data[:-1], data[:HEADER.size + 2 + 128] + b"\x00\x01\x03\x00\x05" + bytes(8)]:
+            with self.assertRaises(ErrorDecodingMessage):
+                codec.decode(frame)
+
+    def test_malformed_frames(self):
+        codec = WireCodec(self._params(512))
+        point = gen_random_int(1, secp256k1_order) * secp256k1_generator
+        data = codec.encode(MtoABroadcast1(point, 7))
+        small_x = next(x for x in range(1, 100) if _is_x_coordinate(x, secp256k1))
+
+        bad_frames = [
+            data[:-1],
+            data + b"\x00",
+            bytes([WIRE_VERSION + 1]) + data[1:],
+            data[:1] + b"\xff" + data[2:],
+            data[:HEADER.size] + b"\x05" + data[HEADER.size + 1:],
+            codec.encode(SigningShare(1, 7))[:HEADER.size] + secp256k1_order.to_bytes(32, 'big') + bytes(8),
+            # a valid x coordinate, but not reduced mod p
+            data[:HEADER.size + 1] + (small_x + secp256k1.field.prime).to_bytes(32, 'big') + data[-8:]
+        ]
+        for frame in bad_frames:
+            with self.assertRaises(ErrorDecodingMessage):
+                codec.decode(frame)
+
+        with self.assertRaises(ValueError):
+            codec.encode(SigningShare(secp256k1_order ** 2, 7))
+        with self.assertRaises(ValueError):
+            codec.encode(KeyGenBroadcast(point, generate_key_pair(512)[0], [point]))
+
+    def test_signing_over_the_wire(self):
+        params = self._params(1536)
+        delegate = WireDelegate(WireCodec(params))
+        participants = [ Participant(i, delegate, params) for i in range(1, params.party_size + 1) ]
+        delegate.participants = participants
+
+        for each in participants:
+            each.key_gen()
+        public_key = participants[0].public_key()
+
+        message = gen_random_int(0, 2 ** params.security_parameter)
+        signers = participants[:2]
+        for each in signers:
+            each.prepare_for_signing(message, {1, 2})
+        for each in signers:
+            each.sign()
+
+        for each in signers:
+            self.assertTrue(each.signature().verify(message, public_key))
+        self.assertGreater(delegate.bytes_sent, 0)
+
+    def test_batched_signing_over_the_wire(self):
+        params = self._params(1536)
+        wire_delegate = WireDelegate(WireCodec(params))
+        delegate = BatchingDelegate(wire_delegate)
+        participants = [ Participant(i, delegate, params) for i in range(1, params.party_size + 1) ]
+        wire_delegate.participants = participants
+
+        for each in participants:
+            each.key_gen()
+        public_key = participants[0].public_key()
+
+        messages = { session_id: gen_random_int(0, 2 ** params.security_parameter) for session_id in range(1, 4) }
+        wire_delegate.sends = 0
+        with delegate.hold():
+            for session_id, message in messages.items():
+                for each in participants:
+                    each.prepare_for_signing(message, {1, 2, 3}, session_id)
+                    each.sign(session_id=session_id)
+
+        for session_id, message in messages.items():
+            for each in participants:
+                self.assertTrue(each.signature(session_id).verify(message, public_key))
+
+        # 90 sends without batching: one per message
+        self.assertLess(wire_delegate.sends, 20)